@@ -0,0 +1,87 @@
+# benchmarks/lock_contention.py
+"""
+Benchmark de contenção de locks do ActionService
+
+Simula vários servidores usando o bot ao mesmo tempo (entradas, fechamento
+e resultado) com um disco lento, comparando um lock global (lock_stripes=1)
+com os locks listrados por ação.
+
+Uso: python -m benchmarks.lock_contention [servidores] [latencia_ms]
+"""
+import asyncio
+import shutil
+import sys
+import tempfile
+import time
+
+from services.action_service import ActionService
+
+
+class SlowDiskActionService(ActionService):
+    """ActionService cujo histórico simula um disco lento"""
+    
+    disk_latency = 0.005
+    
+    def _write_history(self, records):
+        time.sleep(self.disk_latency)
+        super()._write_history(records)
+
+
+async def simulate_guild(service: ActionService, guild_id: int, joins: int) -> int:
+    """Ciclo completo de uma ação em um servidor; retorna nº de operações"""
+    action = await service.create_action(
+        guild_id=guild_id,
+        action_name="Benchmark",
+        action_type="BENCHMARK",
+        config={'max_participants': joins},
+        channel_id=guild_id,
+        message_id=guild_id
+    )
+    for user_id in range(joins):
+        await service.add_participant(action.action_id, user_id)
+    await service.close_action(action.action_id, 1)
+    await service.set_result(action.action_id, "victory", 1)
+    return joins + 3
+
+
+async def run(lock_stripes: int, guilds: int, joins: int, latency: float) -> float:
+    data_dir = tempfile.mkdtemp(prefix="bench_locks_")
+    try:
+        SlowDiskActionService.disk_latency = latency
+        service = SlowDiskActionService(
+            data_dir=data_dir,
+            use_journal=True,
+            lock_stripes=lock_stripes
+        )
+        
+        start = time.perf_counter()
+        ops = await asyncio.gather(*(
+            simulate_guild(service, guild_id, joins)
+            for guild_id in range(1, guilds + 1)
+        ))
+        elapsed = time.perf_counter() - start
+        
+        await service.close()
+        return sum(ops) / elapsed
+    finally:
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+
+def main():
+    guilds = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    latency_ms = float(sys.argv[2]) if len(sys.argv) > 2 else 5
+    joins = 10
+    
+    print(f"📊 {guilds} servidores, {joins} entradas por ação, disco com {latency_ms}ms por escrita")
+    
+    global_lock = asyncio.run(run(1, guilds, joins, latency_ms / 1000))
+    print(f"🔒 Lock global:     {global_lock:10.1f} ops/s")
+    
+    striped = asyncio.run(run(64, guilds, joins, latency_ms / 1000))
+    print(f"🔓 Locks listrados: {striped:10.1f} ops/s")
+    
+    print(f"🚀 Ganho: {striped / global_lock:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -1,33 +1,70 @@
 # cogs/action_views.py
 import discord
 from discord import ui
-from typing import Optional
+from typing import Dict, Optional
 from utils import (
     create_action_embed, create_error_embed, create_success_embed,
-    can_escalate, is_escalator, can_manage_action, get_missing_roles_text
+    can_escalate, is_escalator, can_manage_action, get_missing_roles_text,
+    check_rate_limit
 )
 import asyncio
+import functools
+from services import OutboundScheduler
+
+
+async def acknowledge(interaction: discord.Interaction):
+    """Reconhece (defer) a interação pela classe de maior prioridade do OutboundScheduler"""
+    if not interaction.response.is_done():
+        async with interaction.client.outbound.slot(OutboundScheduler.INTERACTION):
+            await interaction.response.defer(ephemeral=True)
+
+
+def deferred(callback):
+    """
+    Reconhece a interação antes de rodar o callback, para a trava, a escrita
+    e a renderização não estourarem os 3s do Discord; o callback responde por
+    followup e a latência até o reconhecimento fica em bot.interaction_metrics
+    """
+    @functools.wraps(callback)
+    async def wrapper(self, interaction: discord.Interaction, *args):
+        await acknowledge(interaction)
+        elapsed = (discord.utils.utcnow() - interaction.created_at).total_seconds()
+        self.bot.interaction_metrics.record(f"{type(self).__name__}.{callback.__name__}", elapsed)
+        
+        try:
+            await callback(self, interaction, *args)
+        except Exception as e:
+            print(f"❌ Erro em {callback.__name__} (ação {self.action_id}): {e}")
+            await interaction.followup.send(
+                embed=create_error_embed("Não foi possível concluir a operação!"),
+                ephemeral=True
+            )
+    
+    return wrapper
 
 
 class ActionView(ui.View):
-    """View persistente para ações - sobrevive a reinicializações"""
+    """
+    View das ações; os botões são itens dinâmicos (custom_id com o action_id),
+    então os cliques não dependem desta instância estar registrada no bot
+    """
     
-    def __init__(self, bot, action_id: str):
+    def __init__(self, bot, action_id: str, action=None):
         super().__init__(timeout=None)
         self.bot = bot
         self.action_id = action_id
         self.action_service = bot.action_service
         self.config_service = bot.config_service
         
-        # Cooldown para prevenir spam
-        self._cooldowns = {}
-        
         # Adiciona botões dinamicamente
-        self._setup_buttons()
+        self._setup_buttons(action)
     
-    def _setup_buttons(self):
-        """Configura botões baseado na configuração da ação"""
-        action = self.action_service.get_action(self.action_id)
+    def _setup_buttons(self, action=None):
+        """
+        Configura botões baseado na configuração da ação
+        A ação pode vir pronta (ainda não registrada, na criação)
+        """
+        action = action or self.action_service.get_action(self.action_id)
         if not action:
             return
         
@@ -56,122 +93,50 @@ class ActionView(ui.View):
     
     def create_escalator_button(self):
         """Cria botão de escalador"""
-        button = ui.Button(
-            label="📋 Assumir Escalação",
-            style=discord.ButtonStyle.primary,
-            custom_id="action:escalator",
-            row=0
-        )
-        button.callback = self.escalator_button_callback
-        return button
+        return EscalatorButton(self.action_id)
     
     def create_call_p1_button(self):
         """Cria botão de Call P1"""
-        button = ui.Button(
-            label="📞 Call P1",
-            style=discord.ButtonStyle.primary,
-            custom_id="action:call_p1",
-            row=0
-        )
-        button.callback = self.call_p1_callback
-        return button
+        return CallP1Button(self.action_id)
     
     def create_call_p2_button(self):
         """Cria botão de Call P2"""
-        button = ui.Button(
-            label="📞 Call P2",
-            style=discord.ButtonStyle.primary,
-            custom_id="action:call_p2",
-            row=0
-        )
-        button.callback = self.call_p2_callback
-        return button
+        return CallP2Button(self.action_id)
     
     def create_call_single_button(self):
         """Cria botão de Call único"""
-        button = ui.Button(
-            label="📞 Call",
-            style=discord.ButtonStyle.primary,
-            custom_id="action:call_single",
-            row=0
-        )
-        button.callback = self.call_single_callback
-        return button
+        return CallSingleButton(self.action_id)
     
     def create_join_button(self):
         """Cria botão de entrar"""
-        button = ui.Button(
-            label="✅ Entrar na Ação",
-            style=discord.ButtonStyle.success,
-            custom_id="action:join",
-            row=1
-        )
-        button.callback = self.join_callback
-        return button
+        return JoinButton(self.action_id)
     
     def create_leave_button(self):
         """Cria botão de sair"""
-        button = ui.Button(
-            label="❌ Sair da Ação",
-            style=discord.ButtonStyle.danger,
-            custom_id="action:leave",
-            row=1
-        )
-        button.callback = self.leave_callback
-        return button
+        return LeaveButton(self.action_id)
     
     def create_panel_button(self):
         """Cria botão do painel"""
-        button = ui.Button(
-            label="⚙️ Painel de Escalação",
-            style=discord.ButtonStyle.secondary,
-            custom_id="action:panel",
-            row=2
-        )
-        button.callback = self.panel_callback
-        return button
+        return PanelButton(self.action_id)
     
-    async def check_cooldown(self, user_id: int) -> bool:
-        """Verifica cooldown do usuário (anti-spam)"""
-        import time
-        current_time = time.time()
-        
-        if user_id in self._cooldowns:
-            if current_time - self._cooldowns[user_id] < 2:  # 2 segundos
-                return False
-        
-        self._cooldowns[user_id] = current_time
-        return True
+    async def check_cooldown(self, interaction: discord.Interaction, kind: str) -> bool:
+        """Verifica o limite de cliques do usuário (anti-spam) no limitador do bot"""
+        return await check_rate_limit(interaction, kind)
     
     async def update_message(self, interaction: discord.Interaction):
-        """Atualiza a mensagem da ação"""
-        action = self.action_service.get_action(self.action_id)
-        if not action:
-            return
-        
-        embed = create_action_embed(action, interaction.guild)
-        
-        # Recria a view com botões atualizados
-        new_view = ActionView(self.bot, self.action_id)
-        
-        try:
-            await interaction.message.edit(embed=embed, view=new_view)
-        except:
-            pass
+        """Atualiza a mensagem da ação (cliques seguidos viram uma única edição)"""
+        self.bot.edit_coalescer.request(self.action_id)
     
+    @deferred
     async def escalator_button_callback(self, interaction: discord.Interaction):
         """Botão para assumir escalação"""
         # Verifica cooldown
-        if not await self.check_cooldown(interaction.user.id):
-            await interaction.response.send_message(
-                "⏱️ Aguarde alguns segundos antes de clicar novamente!",
-                ephemeral=True
-            )
+        if not await self.check_cooldown(interaction, "escalator"):
             return
         
         action = self.action_service.get_action(self.action_id)
         if not action:
-            await interaction.response.send_message(
+            await interaction.followup.send(
                 embed=create_error_embed("Ação não encontrada!"),
                 ephemeral=True
             )
@@ -179,7 +144,7 @@ class ActionView(ui.View):
         
         # Verifica se já tem escalador
         if action.escalator_id:
-            await interaction.response.send_message(
+            await interaction.followup.send(
                 embed=create_error_embed("Esta ação já possui um escalador!"),
                 ephemeral=True
             )
@@ -187,7 +152,7 @@ class ActionView(ui.View):
         
         # Verifica se está fechada
         if not action.is_open():
-            await interaction.response.send_message(
+            await interaction.followup.send(
                 embed=create_error_embed("Esta ação está fechada!"),
                 ephemeral=True
             )
@@ -196,7 +161,7 @@ class ActionView(ui.View):
         # Verifica permissões
         if not can_escalate(interaction.user, interaction.guild.id, action, self.config_service):
             missing_roles = get_missing_roles_text(interaction.user, interaction.guild.id, self.config_service)
-            await interaction.response.send_message(
+            await interaction.followup.send(
                 embed=create_error_embed(
                     f"Você não tem permissão para assumir esta escalação!\n{missing_roles}",
                     "Permissão Negada"
@@ -209,7 +174,7 @@ class ActionView(ui.View):
         success = await self.action_service.set_escalator(self.action_id, interaction.user.id)
         
         if success:
-            await interaction.response.send_message(
+            await interaction.followup.send(
                 embed=create_success_embed(
                     f"Você assumiu a escalação de **{action.action_name}**!"
                 ),
@@ -217,23 +182,20 @@ class ActionView(ui.View):
             )
             await self.update_message(interaction)
         else:
-            await interaction.response.send_message(
+            await interaction.followup.send(
                 embed=create_error_embed("Não foi possível assumir a escalação!"),
                 ephemeral=True
             )
     
+    @deferred
     async def call_p1_callback(self, interaction: discord.Interaction):
         """Botão para assumir Call P1"""
-        if not await self.check_cooldown(interaction.user.id):
-            await interaction.response.send_message(
-                "⏱️ Aguarde alguns segundos antes de clicar novamente!",
-                ephemeral=True
-            )
+        if not await self.check_cooldown(interaction, "call_p1"):
             return
         
         action = self.action_service.get_action(self.action_id)
         if not action:
-            await interaction.response.send_message(
+            await interaction.followup.send(
                 embed=create_error_embed("Ação não encontrada!"),
                 ephemeral=True
             )
@@ -241,7 +203,7 @@ class ActionView(ui.View):
         
         # Verifica se já está ocupada
         if action.call_p1_id:
-            await interaction.response.send_message(
+            await interaction.followup.send(
                 embed=create_error_embed("Call P1 já está ocupada!"),
                 ephemeral=True
             )
@@ -249,7 +211,7 @@ class ActionView(ui.View):
         
         # Verifica se está fechada
         if not action.is_open():
-            await interaction.response.send_message(
+            await interaction.followup.send(
                 embed=create_error_embed("Esta ação está fechada!"),
                 ephemeral=True
             )
@@ -259,7 +221,7 @@ class ActionView(ui.View):
         success = await self.action_service.set_call_p1(self.action_id, interaction.user.id)
         
         if success:
-            await interaction.response.send_message(
+            await interaction.followup.send(
                 embed=create_success_embed(
                     f"Você assumiu a Call P1 de **{action.action_name}**!"
                 ),
@@ -267,23 +229,20 @@ class ActionView(ui.View):
             )
             await self.update_message(interaction)
         else:
-            await interaction.response.send_message(
+            await interaction.followup.send(
                 embed=create_error_embed("Não foi possível assumir a Call P1!"),
                 ephemeral=True
             )
     
+    @deferred
     async def call_p2_callback(self, interaction: discord.Interaction):
         """Botão para assumir Call P2"""
-        if not await self.check_cooldown(interaction.user.id):
-            await interaction.response.send_message(
-                "⏱️ Aguarde alguns segundos antes de clicar novamente!",
-                ephemeral=True
-            )
+        if not await self.check_cooldown(interaction, "call_p2"):
             return
         
         action = self.action_service.get_action(self.action_id)
         if not action:
-            await interaction.response.send_message(
+            await interaction.followup.send(
                 embed=create_error_embed("Ação não encontrada!"),
                 ephemeral=True
             )
@@ -291,7 +250,7 @@ class ActionView(ui.View):
         
         # Verifica se já está ocupada
         if action.call_p2_id:
-            await interaction.response.send_message(
+            await interaction.followup.send(
                 embed=create_error_embed("Call P2 já está ocupada!"),
                 ephemeral=True
             )
@@ -299,7 +258,7 @@ class ActionView(ui.View):
         
         # Verifica se está fechada
         if not action.is_open():
-            await interaction.response.send_message(
+            await interaction.followup.send(
                 embed=create_error_embed("Esta ação está fechada!"),
                 ephemeral=True
             )
@@ -309,7 +268,7 @@ class ActionView(ui.View):
         success = await self.action_service.set_call_p2(self.action_id, interaction.user.id)
         
         if success:
-            await interaction.response.send_message(
+            await interaction.followup.send(
                 embed=create_success_embed(
                     f"Você assumiu a Call P2 de **{action.action_name}**!"
                 ),
@@ -317,23 +276,20 @@ class ActionView(ui.View):
             )
             await self.update_message(interaction)
         else:
-            await interaction.response.send_message(
+            await interaction.followup.send(
                 embed=create_error_embed("Não foi possível assumir a Call P2!"),
                 ephemeral=True
             )
     
+    @deferred
     async def call_single_callback(self, interaction: discord.Interaction):
         """Botão para assumir Call única (quando não há P1/P2)"""
-        if not await self.check_cooldown(interaction.user.id):
-            await interaction.response.send_message(
-                "⏱️ Aguarde alguns segundos antes de clicar novamente!",
-                ephemeral=True
-            )
+        if not await self.check_cooldown(interaction, "call_single"):
             return
         
         action = self.action_service.get_action(self.action_id)
         if not action:
-            await interaction.response.send_message(
+            await interaction.followup.send(
                 embed=create_error_embed("Ação não encontrada!"),
                 ephemeral=True
             )
@@ -341,7 +297,7 @@ class ActionView(ui.View):
         
         # Verifica se já está ocupada
         if action.call_p1_id:
-            await interaction.response.send_message(
+            await interaction.followup.send(
                 embed=create_error_embed("Call já está ocupada!"),
                 ephemeral=True
             )
@@ -349,7 +305,7 @@ class ActionView(ui.View):
         
         # Verifica se está fechada
         if not action.is_open():
-            await interaction.response.send_message(
+            await interaction.followup.send(
                 embed=create_error_embed("Esta ação está fechada!"),
                 ephemeral=True
             )
@@ -359,7 +315,7 @@ class ActionView(ui.View):
         success = await self.action_service.set_call_p1(self.action_id, interaction.user.id)
         
         if success:
-            await interaction.response.send_message(
+            await interaction.followup.send(
                 embed=create_success_embed(
                     f"Você assumiu a Call de **{action.action_name}**!"
                 ),
@@ -367,23 +323,20 @@ class ActionView(ui.View):
             )
             await self.update_message(interaction)
         else:
-            await interaction.response.send_message(
+            await interaction.followup.send(
                 embed=create_error_embed("Não foi possível assumir a Call!"),
                 ephemeral=True
             )
     
+    @deferred
     async def join_callback(self, interaction: discord.Interaction):
         """Botão para entrar na ação"""
-        if not await self.check_cooldown(interaction.user.id):
-            await interaction.response.send_message(
-                "⏱️ Aguarde alguns segundos antes de clicar novamente!",
-                ephemeral=True
-            )
+        if not await self.check_cooldown(interaction, "join"):
             return
         
         action = self.action_service.get_action(self.action_id)
         if not action:
-            await interaction.response.send_message(
+            await interaction.followup.send(
                 embed=create_error_embed("Ação não encontrada!"),
                 ephemeral=True
             )
@@ -391,7 +344,7 @@ class ActionView(ui.View):
         
         # Verifica se está fechada
         if not action.is_open():
-            await interaction.response.send_message(
+            await interaction.followup.send(
                 embed=create_error_embed("Esta ação está fechada!"),
                 ephemeral=True
             )
@@ -399,7 +352,7 @@ class ActionView(ui.View):
         
         # Verifica se já está na ação
         if interaction.user.id in action.participant_ids:
-            await interaction.response.send_message(
+            await interaction.followup.send(
                 embed=create_error_embed("Você já está nesta ação!"),
                 ephemeral=True
             )
@@ -407,7 +360,7 @@ class ActionView(ui.View):
         
         # Verifica se está cheia
         if action.is_full():
-            await interaction.response.send_message(
+            await interaction.followup.send(
                 embed=create_error_embed("Esta ação está cheia!"),
                 ephemeral=True
             )
@@ -417,7 +370,7 @@ class ActionView(ui.View):
         success = await self.action_service.add_participant(self.action_id, interaction.user.id)
         
         if success:
-            await interaction.response.send_message(
+            await interaction.followup.send(
                 embed=create_success_embed(
                     f"Você entrou na ação **{action.action_name}**!"
                 ),
@@ -425,23 +378,20 @@ class ActionView(ui.View):
             )
             await self.update_message(interaction)
         else:
-            await interaction.response.send_message(
+            await interaction.followup.send(
                 embed=create_error_embed("Não foi possível entrar na ação!"),
                 ephemeral=True
             )
     
+    @deferred
     async def leave_callback(self, interaction: discord.Interaction):
         """Botão para sair da ação"""
-        if not await self.check_cooldown(interaction.user.id):
-            await interaction.response.send_message(
-                "⏱️ Aguarde alguns segundos antes de clicar novamente!",
-                ephemeral=True
-            )
+        if not await self.check_cooldown(interaction, "leave"):
             return
         
         action = self.action_service.get_action(self.action_id)
         if not action:
-            await interaction.response.send_message(
+            await interaction.followup.send(
                 embed=create_error_embed("Ação não encontrada!"),
                 ephemeral=True
             )
@@ -449,7 +399,7 @@ class ActionView(ui.View):
         
         # Verifica se está na ação
         if interaction.user.id not in action.participant_ids:
-            await interaction.response.send_message(
+            await interaction.followup.send(
                 embed=create_error_embed("Você não está nesta ação!"),
                 ephemeral=True
             )
@@ -459,7 +409,7 @@ class ActionView(ui.View):
         success = await self.action_service.remove_participant(self.action_id, interaction.user.id)
         
         if success:
-            await interaction.response.send_message(
+            await interaction.followup.send(
                 embed=create_success_embed(
                     f"Você saiu da ação **{action.action_name}**!"
                 ),
@@ -467,16 +417,17 @@ class ActionView(ui.View):
             )
             await self.update_message(interaction)
         else:
-            await interaction.response.send_message(
+            await interaction.followup.send(
                 embed=create_error_embed("Não foi possível sair da ação!"),
                 ephemeral=True
             )
     
+    @deferred
     async def panel_callback(self, interaction: discord.Interaction):
         """Botão para abrir painel de gerenciamento"""
         action = self.action_service.get_action(self.action_id)
         if not action:
-            await interaction.response.send_message(
+            await interaction.followup.send(
                 embed=create_error_embed("Ação não encontrada!"),
                 ephemeral=True
             )
@@ -484,7 +435,7 @@ class ActionView(ui.View):
         
         # Verifica permissões
         if not can_manage_action(interaction.user, interaction.guild.id, action, self.config_service):
-            await interaction.response.send_message(
+            await interaction.followup.send(
                 embed=create_error_embed(
                     "Apenas o escalador ou administradores podem acessar este painel!",
                     "Permissão Negada"
@@ -501,7 +452,183 @@ class ActionView(ui.View):
             color=discord.Color.blue()
         )
         
-        await interaction.response.send_message(embed=embed, view=view, ephemeral=True)
+        await interaction.followup.send(embed=embed, view=view, ephemeral=True)
+
+
+ACTION_ID_PATTERN = r'(?P<action_id>\d+_\d+)'
+
+
+class ActionButton(ui.DynamicItem[ui.Button], template=r'action:(?P<kind>[a-z0-9_]+):' + ACTION_ID_PATTERN):
+    """
+    Botão de ação sem estado: o custom_id é action:<tipo>:<action_id>
+    Cada tipo é uma subclasse registrada uma vez no bot, que atende os cliques
+    de todas as ações
+    """
+    
+    button_kind = ""
+    button_label = ""
+    button_style = discord.ButtonStyle.primary
+    button_row = 0
+    handler_name = ""
+    
+    def __init__(self, action_id: str):
+        super().__init__(ui.Button(
+            label=self.button_label,
+            style=self.button_style,
+            custom_id=f"action:{self.button_kind}:{action_id}",
+            row=self.button_row
+        ))
+        self.action_id = action_id
+    
+    @classmethod
+    async def from_custom_id(cls, interaction: discord.Interaction, item: ui.Button, match):
+        return cls(match['action_id'])
+    
+    async def callback(self, interaction: discord.Interaction):
+        # Usa a view viva da ação; sem ela (ex.: após reinicializar) o registro
+        # cria e guarda uma, reaproveitada pelos próximos cliques e edições
+        view = interaction.client.view_registry.get_or_create(self.action_id)
+        await getattr(view, self.handler_name)(interaction)
+
+
+class EscalatorButton(ActionButton, template=r'action:escalator:' + ACTION_ID_PATTERN):
+    button_kind = "escalator"
+    button_label = "📋 Assumir Escalação"
+    button_style = discord.ButtonStyle.primary
+    button_row = 0
+    handler_name = "escalator_button_callback"
+
+
+class CallP1Button(ActionButton, template=r'action:call_p1:' + ACTION_ID_PATTERN):
+    button_kind = "call_p1"
+    button_label = "📞 Call P1"
+    button_style = discord.ButtonStyle.primary
+    button_row = 0
+    handler_name = "call_p1_callback"
+
+
+class CallP2Button(ActionButton, template=r'action:call_p2:' + ACTION_ID_PATTERN):
+    button_kind = "call_p2"
+    button_label = "📞 Call P2"
+    button_style = discord.ButtonStyle.primary
+    button_row = 0
+    handler_name = "call_p2_callback"
+
+
+class CallSingleButton(ActionButton, template=r'action:call_single:' + ACTION_ID_PATTERN):
+    button_kind = "call_single"
+    button_label = "📞 Call"
+    button_style = discord.ButtonStyle.primary
+    button_row = 0
+    handler_name = "call_single_callback"
+
+
+class JoinButton(ActionButton, template=r'action:join:' + ACTION_ID_PATTERN):
+    button_kind = "join"
+    button_label = "✅ Entrar na Ação"
+    button_style = discord.ButtonStyle.success
+    button_row = 1
+    handler_name = "join_callback"
+
+
+class LeaveButton(ActionButton, template=r'action:leave:' + ACTION_ID_PATTERN):
+    button_kind = "leave"
+    button_label = "❌ Sair da Ação"
+    button_style = discord.ButtonStyle.danger
+    button_row = 1
+    handler_name = "leave_callback"
+
+
+class PanelButton(ActionButton, template=r'action:panel:' + ACTION_ID_PATTERN):
+    button_kind = "panel"
+    button_label = "⚙️ Painel de Escalação"
+    button_style = discord.ButtonStyle.secondary
+    button_row = 2
+    handler_name = "panel_callback"
+
+
+ACTION_BUTTONS = {button.button_kind: button for button in (
+    EscalatorButton, CallP1Button, CallP2Button, CallSingleButton,
+    JoinButton, LeaveButton, PanelButton
+)}
+
+
+class LegacyActionButton(ui.DynamicItem[ui.Button],
+                         template=r'action:(?P<kind>' + '|'.join(ACTION_BUTTONS) + ')'):
+    """
+    custom_id antigo (action:<tipo>, sem action_id) das mensagens criadas antes
+    dos botões dinâmicos; a ação é achada pelo message_id e, no primeiro
+    clique, a mensagem é reeditada com os botões novos
+    """
+    
+    def __init__(self, kind: str):
+        super().__init__(ui.Button(custom_id=f"action:{kind}"))
+        self.kind = kind
+    
+    @classmethod
+    async def from_custom_id(cls, interaction: discord.Interaction, item: ui.Button, match):
+        return cls(match['kind'])
+    
+    async def callback(self, interaction: discord.Interaction):
+        action_service = interaction.client.action_service
+        # Busca linear: só acontece para mensagens antigas
+        action = next((a for a in action_service.active_actions.values()
+                       if a.message_id == interaction.message.id), None)
+        if not action:
+            await interaction.response.send_message(
+                embed=create_error_embed("Ação não encontrada!"),
+                ephemeral=True
+            )
+            return
+        
+        await ACTION_BUTTONS[self.kind](action.action_id).callback(interaction)
+        interaction.client.edit_coalescer.request(action.action_id)
+
+
+class ActionViewRegistry:
+    """
+    Dono das views anexadas às mensagens de ação
+    Cada ação tem no máximo uma view viva: pedidos seguintes reaproveitam e
+    atualizam a mesma instância, liberada quando a ação recebe resultado ou é apagada
+    """
+    
+    # Eventos do ActionService em que a mensagem perde os botões
+    TERMINAL_EVENTS = ("finished", "deleted")
+    
+    def __init__(self, bot):
+        self.bot = bot
+        self._views: Dict[str, ActionView] = {}
+        bot.action_service.add_listener(self._on_action_event)
+    
+    def get(self, action_id: str) -> Optional[ActionView]:
+        """View viva da ação, se houver"""
+        return self._views.get(action_id)
+    
+    def get_or_create(self, action_id: str, action=None) -> ActionView:
+        """
+        Retorna a view da ação com os botões refeitos para o estado atual
+        Ações com resultado (ou sumidas) recebem uma view avulsa, não registrada
+        """
+        action = action or self.bot.action_service.get_action(action_id)
+        if action is None or action.has_result():
+            return ActionView(self.bot, action_id, action)
+        
+        view = self._views.get(action_id)
+        if view is None:
+            view = self._views[action_id] = ActionView(self.bot, action_id, action)
+        else:
+            view._setup_buttons(action)
+        return view
+    
+    def release(self, action_id: str):
+        """Para a view da ação (sai do ViewStore do discord.py) e a esquece"""
+        view = self._views.pop(action_id, None)
+        if view is not None:
+            view.stop()
+    
+    def _on_action_event(self, event: str, action):
+        if event in self.TERMINAL_EVENTS:
+            self.release(action.action_id)
 
 
 class ManagementPanelView(ui.View):
@@ -515,94 +642,100 @@ class ManagementPanelView(ui.View):
         self.config_service = bot.config_service
     
     @ui.button(label="👤 Gerenciar Escalador", style=discord.ButtonStyle.primary, row=0)
+    @deferred
     async def manage_escalator(self, interaction: discord.Interaction, button: ui.Button):
         """Gerencia o escalador"""
-        await interaction.response.send_message(
+        await interaction.followup.send(
             "Selecione uma ação:",
             view=ManageEscalatorView(self.bot, self.action_id),
             ephemeral=True
         )
     
     @ui.button(label="📞 Gerenciar Calls", style=discord.ButtonStyle.primary, row=0)
+    @deferred
     async def manage_calls(self, interaction: discord.Interaction, button: ui.Button):
         """Gerencia calls"""
-        await interaction.response.send_message(
+        await interaction.followup.send(
             "Selecione uma ação:",
             view=ManageCallsView(self.bot, self.action_id),
             ephemeral=True
         )
     
     @ui.button(label="➕ Adicionar Participante", style=discord.ButtonStyle.primary, row=1)
+    @deferred
     async def add_participant(self, interaction: discord.Interaction, button: ui.Button):
         """Adiciona participante manualmente"""
-        await interaction.response.send_message(
+        await interaction.followup.send(
             "Selecione o usuário para adicionar:",
             view=AddParticipantView(self.bot, self.action_id),
             ephemeral=True
         )
     
     @ui.button(label="➖ Remover Participante", style=discord.ButtonStyle.primary, row=1)
+    @deferred
     async def remove_participant(self, interaction: discord.Interaction, button: ui.Button):
         """Remove participante manualmente"""
         action = self.action_service.get_action(self.action_id)
         if not action or not action.participant_ids:
-            await interaction.response.send_message(
+            await interaction.followup.send(
                 embed=create_error_embed("Não há participantes para remover!"),
                 ephemeral=True
             )
             return
         
-        await interaction.response.send_message(
+        await interaction.followup.send(
             "Selecione o participante para remover:",
             view=RemoveParticipantView(self.bot, self.action_id),
             ephemeral=True
         )
     
     @ui.button(label="🔒 Fechar Escalação", style=discord.ButtonStyle.secondary, row=2)
+    @deferred
     async def close_action(self, interaction: discord.Interaction, button: ui.Button):
         """Fecha a escalação"""
         action = self.action_service.get_action(self.action_id)
         if not action:
-            await interaction.response.send_message(
+            await interaction.followup.send(
                 embed=create_error_embed("Ação não encontrada!"),
                 ephemeral=True
             )
             return
         
         if not action.is_open():
-            await interaction.response.send_message(
+            await interaction.followup.send(
                 embed=create_error_embed("Esta ação já está fechada!"),
                 ephemeral=True
             )
             return
         
         # Confirmação
-        await interaction.response.send_message(
+        await interaction.followup.send(
             "⚠️ Tem certeza que deseja fechar a escalação?",
             view=ConfirmCloseView(self.bot, self.action_id),
             ephemeral=True
         )
     
     @ui.button(label="🔓 Reabrir Ação", style=discord.ButtonStyle.secondary, row=2)
+    @deferred
     async def reopen_action(self, interaction: discord.Interaction, button: ui.Button):
         """Reabre a ação"""
         action = self.action_service.get_action(self.action_id)
         if not action:
-            await interaction.response.send_message(
+            await interaction.followup.send(
                 embed=create_error_embed("Ação não encontrada!"),
                 ephemeral=True
             )
             return
         
         if action.has_result():
-            await interaction.response.send_message(
+            await interaction.followup.send(
                 embed=create_error_embed("Não é possível reabrir uma ação com resultado definido!"),
                 ephemeral=True
             )
             return
         
         if action.is_open():
-            await interaction.response.send_message(
+            await interaction.followup.send(
                 embed=create_error_embed("Esta ação já está aberta!"),
                 ephemeral=True
             )
@@ -611,39 +744,32 @@ class ManagementPanelView(ui.View):
         success = await self.action_service.reopen_action(self.action_id)
         if success:
             # Atualiza mensagem original
-            channel = interaction.guild.get_channel(action.channel_id)
-            if channel:
-                try:
-                    message = await channel.fetch_message(action.message_id)
-                    embed = create_action_embed(action, interaction.guild)
-                    view = ActionView(self.bot, self.action_id)
-                    await message.edit(embed=embed, view=view)
-                except:
-                    pass
+            self.bot.edit_coalescer.request(action.action_id)
             
-            await interaction.response.send_message(
+            await interaction.followup.send(
                 embed=create_success_embed("Ação reaberta com sucesso!"),
                 ephemeral=True
             )
         else:
-            await interaction.response.send_message(
+            await interaction.followup.send(
                 embed=create_error_embed("Não foi possível reabrir a ação!"),
                 ephemeral=True
             )
     
     @ui.button(label="🏆 Definir Vitória", style=discord.ButtonStyle.success, row=3)
+    @deferred
     async def set_victory(self, interaction: discord.Interaction, button: ui.Button):
         """Define resultado como vitória"""
         action = self.action_service.get_action(self.action_id)
         if not action:
-            await interaction.response.send_message(
+            await interaction.followup.send(
                 embed=create_error_embed("Ação não encontrada!"),
                 ephemeral=True
             )
             return
         
         if not action.can_set_result():
-            await interaction.response.send_message(
+            await interaction.followup.send(
                 embed=create_error_embed("A ação precisa estar fechada antes de definir resultado!"),
                 ephemeral=True
             )
@@ -652,38 +778,32 @@ class ManagementPanelView(ui.View):
         success = await self.action_service.set_result(self.action_id, "victory", interaction.user.id)
         if success:
             # Atualiza mensagem original
-            channel = interaction.guild.get_channel(action.channel_id)
-            if channel:
-                try:
-                    message = await channel.fetch_message(action.message_id)
-                    embed = create_action_embed(action, interaction.guild)
-                    await message.edit(embed=embed, view=None)  # Remove botões
-                except:
-                    pass
+            self.bot.edit_coalescer.request(action.action_id)
             
-            await interaction.response.send_message(
+            await interaction.followup.send(
                 embed=create_success_embed("🏆 Vitória registrada!"),
                 ephemeral=True
             )
         else:
-            await interaction.response.send_message(
+            await interaction.followup.send(
                 embed=create_error_embed("Não foi possível registrar a vitória!"),
                 ephemeral=True
             )
     
     @ui.button(label="💀 Definir Derrota", style=discord.ButtonStyle.danger, row=3)
+    @deferred
     async def set_defeat(self, interaction: discord.Interaction, button: ui.Button):
         """Define resultado como derrota"""
         action = self.action_service.get_action(self.action_id)
         if not action:
-            await interaction.response.send_message(
+            await interaction.followup.send(
                 embed=create_error_embed("Ação não encontrada!"),
                 ephemeral=True
             )
             return
         
         if not action.can_set_result():
-            await interaction.response.send_message(
+            await interaction.followup.send(
                 embed=create_error_embed("A ação precisa estar fechada antes de definir resultado!"),
                 ephemeral=True
             )
@@ -692,29 +812,23 @@ class ManagementPanelView(ui.View):
         success = await self.action_service.set_result(self.action_id, "defeat", interaction.user.id)
         if success:
             # Atualiza mensagem original
-            channel = interaction.guild.get_channel(action.channel_id)
-            if channel:
-                try:
-                    message = await channel.fetch_message(action.message_id)
-                    embed = create_action_embed(action, interaction.guild)
-                    await message.edit(embed=embed, view=None)  # Remove botões
-                except:
-                    pass
+            self.bot.edit_coalescer.request(action.action_id)
             
-            await interaction.response.send_message(
+            await interaction.followup.send(
                 embed=create_success_embed("💀 Derrota registrada!"),
                 ephemeral=True
             )
         else:
-            await interaction.response.send_message(
+            await interaction.followup.send(
                 embed=create_error_embed("Não foi possível registrar a derrota!"),
                 ephemeral=True
             )
     
     @ui.button(label="🗑️ Apagar Ação", style=discord.ButtonStyle.danger, row=4)
+    @deferred
     async def delete_action(self, interaction: discord.Interaction, button: ui.Button):
         """Apaga a ação completamente"""
-        await interaction.response.send_message(
+        await interaction.followup.send(
             "⚠️ **ATENÇÃO!** Tem certeza que deseja APAGAR esta ação? Esta operação não pode ser desfeita!",
             view=ConfirmDeleteView(self.bot, self.action_id),
             ephemeral=True
@@ -742,11 +856,12 @@ class ManageEscalatorView(ui.View):
         define_btn.callback = self.define_escalator_callback
         self.add_item(define_btn)
     
+    @deferred
     async def remove_escalator_callback(self, interaction: discord.Interaction):
         """Remove o escalador atual"""
         action = self.action_service.get_action(self.action_id)
         if not action or not action.escalator_id:
-            await interaction.response.send_message(
+            await interaction.followup.send(
                 embed=create_error_embed("Não há escalador para remover!"),
                 ephemeral=True
             )
@@ -754,28 +869,20 @@ class ManageEscalatorView(ui.View):
         
         # Remove escalador
         action.escalator_id = None
-        self.action_service.save_active_actions()
-        self.action_service.save_to_history(action)
+        self.action_service.save_action(action)
         
         # Atualiza mensagem
-        channel = interaction.guild.get_channel(action.channel_id)
-        if channel:
-            try:
-                message = await channel.fetch_message(action.message_id)
-                embed = create_action_embed(action, interaction.guild)
-                view = ActionView(self.bot, self.action_id)
-                await message.edit(embed=embed, view=view)
-            except:
-                pass
-        
-        await interaction.response.send_message(
+        self.bot.edit_coalescer.request(action.action_id)
+        
+        await interaction.followup.send(
             embed=create_success_embed("Escalador removido!"),
             ephemeral=True
         )
     
+    @deferred
     async def define_escalator_callback(self, interaction: discord.Interaction):
         """Define novo escalador"""
-        await interaction.response.send_message(
+        await interaction.followup.send(
             "Selecione o novo escalador:",
             view=DefineEscalatorView(self.bot, self.action_id),
             ephemeral=True
@@ -800,13 +907,14 @@ class DefineEscalatorView(ui.View):
         user_select.callback = self.select_user_callback
         self.add_item(user_select)
     
+    @deferred
     async def select_user_callback(self, interaction: discord.Interaction):
         select = [item for item in self.children if isinstance(item, ui.UserSelect)][0]
         user = select.values[0]
         
         action = self.action_service.get_action(self.action_id)
         if not action:
-            await interaction.response.send_message(
+            await interaction.followup.send(
                 embed=create_error_embed("Ação não encontrada!"),
                 ephemeral=True
             )
@@ -814,21 +922,12 @@ class DefineEscalatorView(ui.View):
         
         # Define novo escalador
         action.escalator_id = user.id
-        self.action_service.save_active_actions()
-        self.action_service.save_to_history(action)
+        self.action_service.save_action(action)
         
         # Atualiza mensagem
-        channel = interaction.guild.get_channel(action.channel_id)
-        if channel:
-            try:
-                message = await channel.fetch_message(action.message_id)
-                embed = create_action_embed(action, interaction.guild)
-                view = ActionView(self.bot, self.action_id)
-                await message.edit(embed=embed, view=view)
-            except:
-                pass
-        
-        await interaction.response.send_message(
+        self.bot.edit_coalescer.request(action.action_id)
+        
+        await interaction.followup.send(
             embed=create_success_embed(f"{user.mention} definido como escalador!"),
             ephemeral=True
         )
@@ -869,71 +968,57 @@ class ManageCallsView(ui.View):
             define_p2.callback = self.define_call_p2_callback
             self.add_item(define_p2)
     
+    @deferred
     async def remove_call_p1_callback(self, interaction: discord.Interaction):
         action = self.action_service.get_action(self.action_id)
         if not action or not action.call_p1_id:
-            await interaction.response.send_message(
+            await interaction.followup.send(
                 embed=create_error_embed("Não há Call P1 para remover!"),
                 ephemeral=True
             )
             return
         
         action.call_p1_id = None
-        self.action_service.save_active_actions()
-        self.action_service.save_to_history(action)
-        
-        channel = interaction.guild.get_channel(action.channel_id)
-        if channel:
-            try:
-                message = await channel.fetch_message(action.message_id)
-                embed = create_action_embed(action, interaction.guild)
-                view = ActionView(self.bot, self.action_id)
-                await message.edit(embed=embed, view=view)
-            except:
-                pass
-        
-        await interaction.response.send_message(
+        self.action_service.save_action(action)
+        
+        self.bot.edit_coalescer.request(action.action_id)
+        
+        await interaction.followup.send(
             embed=create_success_embed("Call P1 removido!"),
             ephemeral=True
         )
     
+    @deferred
     async def remove_call_p2_callback(self, interaction: discord.Interaction):
         action = self.action_service.get_action(self.action_id)
         if not action or not action.call_p2_id:
-            await interaction.response.send_message(
+            await interaction.followup.send(
                 embed=create_error_embed("Não há Call P2 para remover!"),
                 ephemeral=True
             )
             return
         
         action.call_p2_id = None
-        self.action_service.save_active_actions()
-        self.action_service.save_to_history(action)
-        
-        channel = interaction.guild.get_channel(action.channel_id)
-        if channel:
-            try:
-                message = await channel.fetch_message(action.message_id)
-                embed = create_action_embed(action, interaction.guild)
-                view = ActionView(self.bot, self.action_id)
-                await message.edit(embed=embed, view=view)
-            except:
-                pass
-        
-        await interaction.response.send_message(
+        self.action_service.save_action(action)
+        
+        self.bot.edit_coalescer.request(action.action_id)
+        
+        await interaction.followup.send(
             embed=create_success_embed("Call P2 removido!"),
             ephemeral=True
         )
     
+    @deferred
     async def define_call_p1_callback(self, interaction: discord.Interaction):
-        await interaction.response.send_message(
+        await interaction.followup.send(
             "Selecione o Call P1:",
             view=DefineCallP1View(self.bot, self.action_id),
             ephemeral=True
         )
     
+    @deferred
     async def define_call_p2_callback(self, interaction: discord.Interaction):
-        await interaction.response.send_message(
+        await interaction.followup.send(
             "Selecione o Call P2:",
             view=DefineCallP2View(self.bot, self.action_id),
             ephemeral=True
@@ -953,26 +1038,18 @@ class DefineCallP1View(ui.View):
         user_select.callback = self.select_callback
         self.add_item(user_select)
     
+    @deferred
     async def select_callback(self, interaction: discord.Interaction):
         select = [item for item in self.children if isinstance(item, ui.UserSelect)][0]
         user = select.values[0]
         
         action = self.action_service.get_action(self.action_id)
         action.call_p1_id = user.id
-        self.action_service.save_active_actions()
-        self.action_service.save_to_history(action)
-        
-        channel = interaction.guild.get_channel(action.channel_id)
-        if channel:
-            try:
-                message = await channel.fetch_message(action.message_id)
-                embed = create_action_embed(action, interaction.guild)
-                view = ActionView(self.bot, self.action_id)
-                await message.edit(embed=embed, view=view)
-            except:
-                pass
-        
-        await interaction.response.send_message(
+        self.action_service.save_action(action)
+        
+        self.bot.edit_coalescer.request(action.action_id)
+        
+        await interaction.followup.send(
             embed=create_success_embed(f"{user.mention} definido como Call P1!"),
             ephemeral=True
         )
@@ -991,26 +1068,18 @@ class DefineCallP2View(ui.View):
         user_select.callback = self.select_callback
         self.add_item(user_select)
     
+    @deferred
     async def select_callback(self, interaction: discord.Interaction):
         select = [item for item in self.children if isinstance(item, ui.UserSelect)][0]
         user = select.values[0]
         
         action = self.action_service.get_action(self.action_id)
         action.call_p2_id = user.id
-        self.action_service.save_active_actions()
-        self.action_service.save_to_history(action)
-        
-        channel = interaction.guild.get_channel(action.channel_id)
-        if channel:
-            try:
-                message = await channel.fetch_message(action.message_id)
-                embed = create_action_embed(action, interaction.guild)
-                view = ActionView(self.bot, self.action_id)
-                await message.edit(embed=embed, view=view)
-            except:
-                pass
-        
-        await interaction.response.send_message(
+        self.action_service.save_action(action)
+        
+        self.bot.edit_coalescer.request(action.action_id)
+        
+        await interaction.followup.send(
             embed=create_success_embed(f"{user.mention} definido como Call P2!"),
             ephemeral=True
         )
@@ -1034,6 +1103,7 @@ class AddParticipantView(ui.View):
         user_select.callback = self.select_user_callback
         self.add_item(user_select)
     
+    @deferred
     async def select_user_callback(self, interaction: discord.Interaction):
         # Pega o select do componente
         select = [item for item in self.children if isinstance(item, ui.UserSelect)][0]
@@ -1043,22 +1113,14 @@ class AddParticipantView(ui.View):
         if success:
             action = self.action_service.get_action(self.action_id)
             # Atualiza mensagem original
-            channel = interaction.guild.get_channel(action.channel_id)
-            if channel:
-                try:
-                    message = await channel.fetch_message(action.message_id)
-                    embed = create_action_embed(action, interaction.guild)
-                    view = ActionView(self.bot, self.action_id)
-                    await message.edit(embed=embed, view=view)
-                except:
-                    pass
+            self.bot.edit_coalescer.request(action.action_id)
             
-            await interaction.response.send_message(
+            await interaction.followup.send(
                 embed=create_success_embed(f"{user.mention} foi adicionado à ação!"),
                 ephemeral=True
             )
         else:
-            await interaction.response.send_message(
+            await interaction.followup.send(
                 embed=create_error_embed("Não foi possível adicionar o usuário!"),
                 ephemeral=True
             )
@@ -1093,6 +1155,7 @@ class RemoveParticipantView(ui.View):
             select.callback = self.select_callback
             self.add_item(select)
     
+    @deferred
     async def select_callback(self, interaction: discord.Interaction):
         # Pega o select do componente
         select = [item for item in self.children if isinstance(item, ui.Select)][0]
@@ -1100,7 +1163,7 @@ class RemoveParticipantView(ui.View):
         
         action = self.action_service.get_action(self.action_id)
         if action and action.escalator_id == user_id:
-            await interaction.response.send_message(
+            await interaction.followup.send(
                 embed=create_error_embed("Não é possível remover o escalador!"),
                 ephemeral=True
             )
@@ -1109,22 +1172,14 @@ class RemoveParticipantView(ui.View):
         success = await self.action_service.remove_participant(self.action_id, user_id)
         if success:
             # Atualiza mensagem original
-            channel = interaction.guild.get_channel(action.channel_id)
-            if channel:
-                try:
-                    message = await channel.fetch_message(action.message_id)
-                    embed = create_action_embed(action, interaction.guild)
-                    view = ActionView(self.bot, self.action_id)
-                    await message.edit(embed=embed, view=view)
-                except:
-                    pass
+            self.bot.edit_coalescer.request(action.action_id)
             
-            await interaction.response.send_message(
+            await interaction.followup.send(
                 embed=create_success_embed(f"<@{user_id}> foi removido da ação!"),
                 ephemeral=True
             )
         else:
-            await interaction.response.send_message(
+            await interaction.followup.send(
                 embed=create_error_embed("Não foi possível remover o participante!"),
                 ephemeral=True
             )
@@ -1140,27 +1195,20 @@ class ConfirmCloseView(ui.View):
         self.action_service = bot.action_service
     
     @ui.button(label="✅ Confirmar", style=discord.ButtonStyle.success)
+    @deferred
     async def confirm(self, interaction: discord.Interaction, button: ui.Button):
         success = await self.action_service.close_action(self.action_id, interaction.user.id)
         if success:
             action = self.action_service.get_action(self.action_id)
             # Atualiza mensagem original
-            channel = interaction.guild.get_channel(action.channel_id)
-            if channel:
-                try:
-                    message = await channel.fetch_message(action.message_id)
-                    embed = create_action_embed(action, interaction.guild)
-                    view = ActionView(self.bot, self.action_id)
-                    await message.edit(embed=embed, view=view)
-                except:
-                    pass
+            self.bot.edit_coalescer.request(action.action_id)
             
-            await interaction.response.send_message(
+            await interaction.followup.send(
                 embed=create_success_embed("Escalação fechada! Agora você pode definir o resultado."),
                 ephemeral=True
             )
         else:
-            await interaction.response.send_message(
+            await interaction.followup.send(
                 embed=create_error_embed("Não foi possível fechar a escalação!"),
                 ephemeral=True
             )
@@ -1168,8 +1216,9 @@ class ConfirmCloseView(ui.View):
         self.stop()
     
     @ui.button(label="❌ Cancelar", style=discord.ButtonStyle.secondary)
+    @deferred
     async def cancel(self, interaction: discord.Interaction, button: ui.Button):
-        await interaction.response.send_message("Operação cancelada.", ephemeral=True)
+        await interaction.followup.send("Operação cancelada.", ephemeral=True)
         self.stop()
 
 
@@ -1183,44 +1232,89 @@ class ConfirmDeleteView(ui.View):
         self.action_service = bot.action_service
     
     @ui.button(label="✅ Sim, Apagar", style=discord.ButtonStyle.danger)
+    @deferred
     async def confirm(self, interaction: discord.Interaction, button: ui.Button):
         action = self.action_service.get_action(self.action_id)
         if not action:
-            await interaction.response.send_message(
+            await interaction.followup.send(
                 embed=create_error_embed("Ação não encontrada!"),
                 ephemeral=True
             )
             return
         
         # Tenta deletar mensagem
-        channel = interaction.guild.get_channel(action.channel_id)
-        if channel:
-            try:
-                message = await channel.fetch_message(action.message_id)
-                await message.delete()
-            except:
-                pass
+        try:
+            await self.bot.message_updater.delete(self.action_id)
+        except:
+            pass
         
         # Remove do serviço
         await self.action_service.delete_action(self.action_id)
+        self.bot.edit_coalescer.forget(self.action_id)
         
-        await interaction.response.send_message(
+        await interaction.followup.send(
             embed=create_success_embed("🗑️ Ação apagada com sucesso!"),
             ephemeral=True
         )
         self.stop()
     
     @ui.button(label="❌ Não, Cancelar", style=discord.ButtonStyle.secondary)
+    @deferred
     async def cancel(self, interaction: discord.Interaction, button: ui.Button):
-        await interaction.response.send_message("Operação cancelada.", ephemeral=True)
+        await interaction.followup.send("Operação cancelada.", ephemeral=True)
         self.stop()
 
 
+def render_action_message(bot, action_id: str):
+    """
+    Renderiza a mensagem da ação para o EditCoalescer
+    Retorna (kwargs do edit, assinatura) ou None se a ação não existir
+    """
+    action = bot.action_service.get_action(action_id)
+    if not action:
+        return None
+    
+    embed = create_action_embed(action, bot.get_guild(action.guild_id))
+    
+    # Ações com resultado ficam sem botões
+    view = None if action.has_result() else bot.view_registry.get_or_create(action_id)
+    
+    # A versão muda a cada mutação: mesma versão e mesmos botões = mesma mensagem
+    buttons = tuple(item.custom_id for item in view.children) if view else None
+    signature = (action.version, buttons)
+    return {'embed': embed, 'view': view}, signature
+
+
+async def publish_action(bot, channel, action_name: str, action_type: str, config: Dict):
+    """
+    Cria a ação e publica sua mensagem em um único envio: o ID, o embed e os
+    botões existem antes do send, e a ação só é gravada (já com o message_id)
+    depois que a mensagem existe
+    """
+    action_service = bot.action_service
+    action = await action_service.new_action(
+        channel.guild.id, action_name, action_type, config, channel.id
+    )
+    
+    embed = create_action_embed(action, channel.guild)
+    view = bot.view_registry.get_or_create(action.action_id, action)
+    try:
+        message = await bot.outbound.run(OutboundScheduler.LIVE_EDIT, channel.id,
+                                         lambda: channel.send(embed=embed, view=view))
+    except Exception:
+        # Sem mensagem a ação nunca existiu: nada foi gravado nem contado
+        bot.view_registry.release(action.action_id)
+        action_service.discard_action(action)
+        raise
+    
+    return await action_service.register_action(action, message.id)
+
+
 def setup_persistent_views(bot):
-    """Registra todas as views persistentes no bot"""
-    # Percorre todas as ações ativas e registra as views
-    for action_id in bot.action_service.active_actions.keys():
-        view = ActionView(bot, action_id)
-        bot.add_view(view)
+    """Registra os botões dinâmicos das ações e o registro de views no bot"""
+    bot.view_registry = ActionViewRegistry(bot)
+    
+    # Um item por tipo de botão atende todas as ações, inclusive após reinicializar
+    bot.add_dynamic_items(*ACTION_BUTTONS.values(), LegacyActionButton)
     
-    print(f"✅ {len(bot.action_service.active_actions)} views persistentes registradas")
\ No newline at end of file
+    print(f"✅ {len(ACTION_BUTTONS) + 1} tipos de botão de ação registrados")
\ No newline at end of file
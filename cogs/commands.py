@@ -2,8 +2,8 @@
 import discord # type: ignore
 from discord import app_commands # type: ignore
 from discord.ext import commands # type: ignore
-from utils import create_config_embed, create_error_embed, create_success_embed, create_action_embed
-from cogs.action_views import ActionView
+from utils import create_config_embed, create_error_embed, create_success_embed, check_rate_limit
+from cogs.action_views import acknowledge, publish_action
 
 
 class CommandsCog(commands.Cog):
@@ -50,6 +50,9 @@ class CommandsCog(commands.Cog):
     @app_commands.command(name="criar_acao", description="Cria uma ação manualmente")
     @app_commands.describe(nome="Nome da ação")
     async def criar_acao(self, interaction: discord.Interaction, nome: str):
+        if not await check_rate_limit(interaction, "criar_acao"):
+            return
+        
         config = self.config_service.get_server_config(interaction.guild.id)
         
         if not config['escalation_channel']:
@@ -71,38 +74,21 @@ class CommandsCog(commands.Cog):
         action_type = self.config_service.get_action_type_key(nome)
         action_config = self.config_service.get_action_config(nome)
         
-        # Cria embed
-        embed = discord.Embed(
-            title="🚨 Nova Ação Criada",
-            description=f"**{nome}**",
-            color=discord.Color.red()
-        )
-        embed.add_field(name="Status", value="🟢 ABERTA", inline=False)
-        embed.add_field(name="Criada por", value=interaction.user.mention, inline=False)
-        
-        # Envia mensagem
-        view = ActionView(self.bot, "temp")  # Temporário
-        message = await channel.send(embed=embed, view=view)
-        
-        # Cria ação no service
-        action = await self.action_service.create_action(
-            guild_id=interaction.guild.id,
-            action_name=nome,
-            action_type=action_type,
-            config=action_config,
-            channel_id=channel.id,
-            message_id=message.id
-        )
-        
-        # Atualiza view com ID correto
-        final_view = ActionView(self.bot, action.action_id)
-        self.bot.add_view(final_view)
+        # O envio da mensagem pode esperar na fila de edições: reconhece antes
+        await acknowledge(interaction)
         
-        # Atualiza mensagem com embed e view corretos
-        final_embed = create_action_embed(action, interaction.guild)
-        await message.edit(embed=final_embed, view=final_view)
+        # Cria a ação e publica a mensagem já com o embed e os botões finais
+        try:
+            await publish_action(self.bot, channel, nome, action_type, action_config)
+        except Exception as e:
+            print(f"❌ Erro ao criar ação: {e}")
+            await interaction.followup.send(
+                embed=create_error_embed("Não foi possível criar a ação!"),
+                ephemeral=True
+            )
+            return
         
-        await interaction.response.send_message(
+        await interaction.followup.send(
             embed=create_success_embed(f"Ação **{nome}** criada com sucesso!"),
             ephemeral=True
         )
@@ -138,12 +124,12 @@ class CommandsCog(commands.Cog):
             embed.set_footer(text=f"Mostrando 25 de {len(actions)} ações")
         
         await interaction.response.send_message(embed=embed, ephemeral=True)
-
+    
     @app_commands.command(name="configuracoes", description="Abre o painel de configurações do servidor")
     @app_commands.checks.has_permissions(administrator=True)
     async def configuracoes(self, interaction: discord.Interaction):
         from cogs.config_views import ConfigMainView
-
+        
         embed = discord.Embed(
             title="⚙️ Painel de Configurações",
             description=(
@@ -152,7 +138,7 @@ class CommandsCog(commands.Cog):
             ),
             color=discord.Color.blurple()
         )
-
+        
         await interaction.response.send_message(
             embed=embed,
             view=ConfigMainView(self.bot),
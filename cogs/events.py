@@ -1,8 +1,7 @@
 # cogs/events.py
 import discord
 from discord.ext import commands
-from utils import create_action_embed
-from cogs.action_views import ActionView
+from cogs.action_views import publish_action
 
 
 class EventsCog(commands.Cog):
@@ -17,13 +16,13 @@ class EventsCog(commands.Cog):
     async def on_message(self, message: discord.Message):
         """Detecta mensagens no canal de ações e cria escalações automaticamente"""
         
-        # Ignora mensagens do próprio bot
-        if message.author == self.bot.user:
+        # Filtro barato primeiro: só o canal de ações configurado interessa
+        # (DMs não têm servidor e nunca estão no conjunto)
+        if message.guild is None or not self.config_service.is_action_channel(message.channel.id):
             return
         
-        # Verifica se é no canal de ações configurado
-        config = self.config_service.get_server_config(message.guild.id)
-        if message.channel.id != config.get('action_channel'):
+        # Ignora mensagens do próprio bot
+        if message.author == self.bot.user:
             return
         
         # Verifica se tem embeds
@@ -74,36 +73,8 @@ class EventsCog(commands.Cog):
         action_type = self.config_service.get_action_type_key(action_name)
         action_config = self.config_service.get_action_config(action_name)
         
-        # Cria embed temporário
-        embed = discord.Embed(
-            title="🚨 Nova Ação Detectada",
-            description=f"**{action_name}**",
-            color=discord.Color.red()
-        )
-        embed.add_field(name="Status", value="🟢 ABERTA", inline=False)
-        embed.add_field(name="Detectada de", value=message.jump_url, inline=False)
-        
-        # Envia mensagem com view temporária
-        view = ActionView(self.bot, "temp")
-        escalation_message = await escalation_channel.send(embed=embed, view=view)
-        
-        # Cria ação no service
-        action = await self.action_service.create_action(
-            guild_id=message.guild.id,
-            action_name=action_name,
-            action_type=action_type,
-            config=action_config,
-            channel_id=escalation_channel.id,
-            message_id=escalation_message.id
-        )
-        
-        # Cria view final com ID correto
-        final_view = ActionView(self.bot, action.action_id)
-        self.bot.add_view(final_view)
-        
-        # Atualiza mensagem com embed e view corretos
-        final_embed = create_action_embed(action, message.guild)
-        await escalation_message.edit(embed=final_embed, view=final_view)
+        # Cria a ação e publica a mensagem já com o embed e os botões finais
+        await publish_action(self.bot, escalation_channel, action_name, action_type, action_config)
         
         print(f"✅ Ação '{action_name}' criada automaticamente no servidor {message.guild.name}")
     
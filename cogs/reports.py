@@ -2,10 +2,51 @@
 import discord # type: ignore
 from discord import app_commands # type: ignore
 from discord.ext import commands # type: ignore
+import time
+from collections import OrderedDict
 from datetime import datetime, timedelta
-from typing import Dict, List
-from collections import defaultdict
-from models.action import ActionStatus
+from typing import Dict, Hashable, List, Optional
+from utils import check_rate_limit
+from cogs.action_views import acknowledge
+
+
+class ReportCache:
+    """
+    Cache LRU dos embeds de relatório, chaveado por (servidor, janela, versão do histórico)
+    Qualquer gravação no histórico do servidor muda a versão, então uma entrada
+    só é reaproveitada enquanto os dados não mudaram
+    """
+    
+    def __init__(self, max_entries: int = 64, max_age_seconds: float = 300):
+        self.max_entries = max_entries
+        # As janelas são móveis (últimas N horas): mesmo sem gravações,
+        # uma entrada antiga deixaria de fora ações que já saíram da janela
+        self.max_age_seconds = max_age_seconds
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+    
+    def get(self, key: Hashable) -> Optional[discord.Embed]:
+        """Retorna uma cópia do embed em cache, ou None"""
+        entry = self._entries.get(key)
+        if entry is None or time.monotonic() - entry[0] > self.max_age_seconds:
+            self._entries.pop(key, None)
+            self.misses += 1
+            return None
+        
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1].copy()
+    
+    def put(self, key: Hashable, embed: discord.Embed):
+        """Guarda o embed, descartando o menos usado se o cache estiver cheio"""
+        self._entries[key] = (time.monotonic(), embed)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+    
+    def __len__(self) -> int:
+        return len(self._entries)
 
 
 class ReportsCog(commands.Cog):
@@ -15,56 +56,8 @@ class ReportsCog(commands.Cog):
         self.bot = bot
         self.action_service = bot.action_service
         self.config_service = bot.config_service
-    
-    def calculate_statistics(self, actions: List, guild_id: int) -> Dict:
-        """Calcula estatísticas das ações"""
-        stats = {
-            'total_actions': len(actions),
-            'completed_actions': 0,
-            'victories': 0,
-            'defeats': 0,
-            'inactivities': 0,
-            'participant_count': defaultdict(int),
-            'victory_count': defaultdict(int),
-            'escalator_count': defaultdict(int),
-            'call_p1_count': defaultdict(int),
-            'call_p2_count': defaultdict(int)
-        }
-        
-        for action in actions:
-            # Filtra apenas ações com resultado
-            if not action.has_result():
-                continue
-            
-            stats['completed_actions'] += 1
-            
-            if action.status == ActionStatus.VITORIA.value:
-                stats['victories'] += 1
-            elif action.status == ActionStatus.DERROTA.value:
-                stats['defeats'] += 1
-            elif action.status == ActionStatus.INATIVIDADE.value:
-                stats['inactivities'] += 1
-            
-            # Contabiliza participações
-            for participant_id in action.participant_ids:
-                stats['participant_count'][participant_id] += 1
-                
-                # Contabiliza vitórias
-                if action.status == ActionStatus.VITORIA.value:
-                    stats['victory_count'][participant_id] += 1
-            
-            # Contabiliza escalações
-            if action.escalator_id:
-                stats['escalator_count'][action.escalator_id] += 1
-            
-            # Contabiliza calls
-            if action.call_p1_id:
-                stats['call_p1_count'][action.call_p1_id] += 1
-            
-            if action.call_p2_id:
-                stats['call_p2_count'][action.call_p2_id] += 1
-        
-        return stats
+        self.stats_aggregator = bot.stats_aggregator
+        self.report_cache = ReportCache()
     
     def create_report_embed(self, guild_id: int, stats: Dict, 
                            title: str, description: str, 
@@ -173,19 +166,48 @@ class ReportsCog(commands.Cog):
         
         return embed
     
-    async def generate_daily_report(self, guild_id: int) -> discord.Embed:
-        """Gera relatório diário"""
-        # Carrega ações das últimas 24h
-        history = self.action_service.load_history(days=1)
+    async def build_reports(self, guild_ids: List[int], window: str, days: int,
+                            title: str, description: str,
+                            color: discord.Color) -> Dict[int, discord.Embed]:
+        """
+        Gera o relatório da janela para vários servidores
+        Reaproveita o cache enquanto o histórico de cada servidor não muda;
+        os que faltam são calculados juntos, com uma única leitura do histórico
+        """
+        embeds = {}
+        missing = {}
+        for guild_id in guild_ids:
+            key = (guild_id, window, days, self.action_service.history_version(guild_id))
+            embed = self.report_cache.get(key)
+            if embed is not None:
+                embeds[guild_id] = embed
+            else:
+                missing[guild_id] = key
         
-        # Filtra ações do servidor
-        actions = [a for a in history if a.guild_id == guild_id]
+        if missing:
+            # Soma os dias pré-agregados
+            stats_by_guild = await self.stats_aggregator.get_statistics_many(list(missing), days=days)
+            for guild_id, key in missing.items():
+                embed = self.create_report_embed(guild_id, stats_by_guild[guild_id],
+                                                 title, description, color)
+                self.report_cache.put(key, embed)
+                embeds[guild_id] = embed
         
-        stats = self.calculate_statistics(actions, guild_id)
-        
-        return self.create_report_embed(
+        return embeds
+    
+    async def build_report(self, guild_id: int, window: str, days: int,
+                           title: str, description: str,
+                           color: discord.Color) -> discord.Embed:
+        """Gera o relatório da janela para um servidor"""
+        embeds = await self.build_reports([guild_id], window, days, title, description, color)
+        return embeds[guild_id]
+    
+    async def generate_daily_report(self, guild_id: int) -> discord.Embed:
+        """Gera relatório diário"""
+        return await self.build_report(
             guild_id,
-            stats,
+            "daily",
+            1,
             "📊 Relatório Diário",
             "Estatísticas das últimas 24 horas",
             discord.Color.blue()
@@ -193,17 +215,32 @@ class ReportsCog(commands.Cog):
     
     async def generate_weekly_report(self, guild_id: int) -> discord.Embed:
         """Gera relatório semanal"""
-        # Carrega ações dos últimos 7 dias
-        history = self.action_service.load_history(days=7)
-        
-        # Filtra ações do servidor
-        actions = [a for a in history if a.guild_id == guild_id]
-        
-        stats = self.calculate_statistics(actions, guild_id)
-        
-        return self.create_report_embed(
+        return await self.build_report(
             guild_id,
-            stats,
+            "weekly",
+            7,
+            "📊 Relatório Semanal",
+            "Estatísticas dos últimos 7 dias",
+            discord.Color.gold()
+        )
+    
+    async def generate_daily_reports(self, guild_ids: List[int]) -> Dict[int, discord.Embed]:
+        """Gera os relatórios diários de vários servidores (envio agendado)"""
+        return await self.build_reports(
+            guild_ids,
+            "daily",
+            1,
+            "📊 Relatório Diário",
+            "Estatísticas das últimas 24 horas",
+            discord.Color.blue()
+        )
+    
+    async def generate_weekly_reports(self, guild_ids: List[int]) -> Dict[int, discord.Embed]:
+        """Gera os relatórios semanais de vários servidores (envio agendado)"""
+        return await self.build_reports(
+            guild_ids,
+            "weekly",
+            7,
             "📊 Relatório Semanal",
             "Estatísticas dos últimos 7 dias",
             discord.Color.gold()
@@ -211,17 +248,10 @@ class ReportsCog(commands.Cog):
     
     async def generate_custom_report(self, guild_id: int, days: int) -> discord.Embed:
         """Gera relatório personalizado"""
-        # Carrega ações do período especificado
-        history = self.action_service.load_history(days=days)
-        
-        # Filtra ações do servidor
-        actions = [a for a in history if a.guild_id == guild_id]
-        
-        stats = self.calculate_statistics(actions, guild_id)
-        
-        return self.create_report_embed(
+        return await self.build_report(
             guild_id,
-            stats,
+            "custom",
+            days,
             f"📊 Relatório Personalizado ({days} dias)",
             f"Estatísticas dos últimos {days} dias",
             discord.Color.purple()
@@ -229,19 +259,28 @@ class ReportsCog(commands.Cog):
     
     @app_commands.command(name="relatorio_diario", description="Gera um relatório das ações do dia")
     async def relatorio_diario(self, interaction: discord.Interaction):
-        await interaction.response.defer(ephemeral=True)
+        if not await check_rate_limit(interaction, "report"):
+            return
+        
+        await acknowledge(interaction)
         embed = await self.generate_daily_report(interaction.guild.id)
         await interaction.followup.send(embed=embed, ephemeral=True)
     
     @app_commands.command(name="relatorio_semanal", description="Gera um relatório das ações da semana")
     async def relatorio_semanal(self, interaction: discord.Interaction):
-        await interaction.response.defer(ephemeral=True)
+        if not await check_rate_limit(interaction, "report"):
+            return
+        
+        await acknowledge(interaction)
         embed = await self.generate_weekly_report(interaction.guild.id)
         await interaction.followup.send(embed=embed, ephemeral=True)
     
     @app_commands.command(name="relatorio_personalizado", description="Gera um relatório personalizado")
     @app_commands.describe(dias="Número de dias para analisar")
     async def relatorio_personalizado(self, interaction: discord.Interaction, dias: int):
+        if not await check_rate_limit(interaction, "report"):
+            return
+        
         if dias < 1 or dias > 365:
             await interaction.response.send_message(
                 "⚠️ Por favor, escolha um período entre 1 e 365 dias.",
@@ -249,7 +288,7 @@ class ReportsCog(commands.Cog):
             )
             return
         
-        await interaction.response.defer(ephemeral=True)
+        await acknowledge(interaction)
         embed = await self.generate_custom_report(interaction.guild.id, dias)
         await interaction.followup.send(embed=embed, ephemeral=True)
 
@@ -2,9 +2,12 @@
 import discord # type: ignore
 from discord.ext import commands, tasks # type: ignore
 from datetime import datetime, time
+from functools import partial
+from typing import List, Tuple
 import pytz # type: ignore
-from utils import create_action_embed, create_warning_embed
+from utils import create_warning_embed
 from cogs.action_views import ActionView
+from services import InactivityScheduler, NotificationDispatcher, ReportJob
 
 
 class TasksCog(commands.Cog):
@@ -14,103 +17,112 @@ class TasksCog(commands.Cog):
         self.bot = bot
         self.action_service = bot.action_service
         self.config_service = bot.config_service
+        self.scheduler = bot.inactivity_scheduler
+        self.report_dispatcher = bot.report_dispatcher
+        self.notifications = bot.notification_dispatcher
         
         # Inicia tasks
         self.check_inactivity.start()
+        self.evict_finished_actions.start()
         self.daily_reports.start()
         self.weekly_reports.start()
     
     def cog_unload(self):
         """Para tasks quando o cog é descarregado"""
         self.check_inactivity.cancel()
+        self.evict_finished_actions.cancel()
         self.daily_reports.cancel()
         self.weekly_reports.cancel()
     
-    @tasks.loop(minutes=30)  # Verifica a cada 30 minutos
+    @tasks.loop(seconds=0)  # Dorme até o próximo prazo da agenda
     async def check_inactivity(self):
-        """Verifica ações inativas e envia avisos/fecha automaticamente"""
-        print("🔍 Verificando inatividade de ações...")
+        """Aguarda o próximo prazo de inatividade e envia avisos/fecha automaticamente"""
+        due = await self.scheduler.wait_due()
         
-        for guild in self.bot.guilds:
-            config = self.config_service.get_server_config(guild.id)
-            warning_hours = config.get('warning_hours', 20)
-            inactivity_hours = config.get('inactivity_hours', 24)
-            
-            # Verifica ações que precisam de aviso
-            actions_to_warn = self.action_service.get_actions_needing_inactivity_check(warning_hours)
-            for action in actions_to_warn:
-                if action.guild_id != guild.id:
-                    continue
-                
-                # Envia aviso ao escalador se houver
-                if action.escalator_id:
-                    try:
-                        escalator = guild.get_member(action.escalator_id)
-                        if escalator:
-                            embed = create_warning_embed(
-                                f"A ação **{action.action_name}** está aberta há {warning_hours}h sem resultado!\n\n"
-                                f"Se não houver atividade em breve, ela será marcada como **INATIVA**.",
-                                "⏰ Aviso de Inatividade"
-                            )
-                            await escalator.send(embed=embed)
-                            print(f"⚠️ Aviso enviado ao escalador da ação {action.action_id}")
-                    except Exception as e:
-                        print(f"Erro ao enviar aviso: {e}")
-                
-                # Marca que o aviso foi enviado
-                await self.action_service.mark_inactivity_warning(action.action_id)
+        for action, kind, hours in due:
+            guild = self.bot.get_guild(action.guild_id)
+            if not guild:
+                # Servidor ainda não disponível (ex.: reconexão): tenta depois
+                self.scheduler.retry(action, kind, hours)
+                continue
             
-            # Verifica ações que devem ser fechadas por inatividade
-            actions_to_close = self.action_service.get_actions_needing_inactivity_close(inactivity_hours)
-            for action in actions_to_close:
-                if action.guild_id != guild.id:
-                    continue
-                
-                # Marca como inativa
-                await self.action_service.set_inactivity(action.action_id)
-                
-                # Atualiza mensagem
-                channel = guild.get_channel(action.channel_id)
-                if channel:
-                    try:
-                        message = await channel.fetch_message(action.message_id)
-                        embed = create_action_embed(action, guild)
-                        await message.edit(embed=embed, view=None)  # Remove botões
-                        print(f"⏰ Ação {action.action_id} marcada como INATIVA")
-                    except Exception as e:
-                        print(f"Erro ao atualizar mensagem de inatividade: {e}")
-                
-                # Notifica o escalador
-                if action.escalator_id:
-                    try:
-                        escalator = guild.get_member(action.escalator_id)
-                        if escalator:
-                            embed = discord.Embed(
-                                title="⏰ Ação Marcada como Inativa",
-                                description=f"A ação **{action.action_name}** foi automaticamente marcada como **INATIVA** "
-                                           f"após {inactivity_hours}h sem resultado.",
-                                color=discord.Color.dark_purple()
-                            )
-                            await escalator.send(embed=embed)
-                    except Exception as e:
-                        print(f"Erro ao notificar inatividade: {e}")
+            # Uma falha (ex.: escrita em disco) não pode derrubar a task
+            try:
+                if kind == InactivityScheduler.WARNING:
+                    await self.warn_inactivity(guild, action, hours)
+                else:
+                    await self.close_for_inactivity(guild, action, hours)
+            except Exception as e:
+                print(f"❌ Erro ao processar inatividade da ação {action.action_id}: {e}")
+                self.scheduler.retry(action, kind, hours)
+    
+    async def warn_inactivity(self, guild: discord.Guild, action, warning_hours: float):
+        """Avisa o escalador de que a ação está perto da inatividade"""
+        # Envia aviso ao escalador se houver
+        if action.escalator_id:
+            try:
+                escalator = guild.get_member(action.escalator_id)
+                if escalator:
+                    embed = create_warning_embed(
+                        f"A ação **{action.action_name}** está aberta há {warning_hours}h sem resultado!\n\n"
+                        f"Se não houver atividade em breve, ela será marcada como **INATIVA**.",
+                        "⏰ Aviso de Inatividade"
+                    )
+                    # DM sai pela fila de notificações, sem travar a agenda
+                    if self.notifications.notify(action.action_id, NotificationDispatcher.WARNING,
+                                                 escalator.id, partial(escalator.send, embed=embed)):
+                        print(f"⚠️ Aviso enfileirado para o escalador da ação {action.action_id}")
+            except Exception as e:
+                print(f"Erro ao enviar aviso: {e}")
+        
+        # Marca que o aviso foi enviado
+        await self.action_service.mark_inactivity_warning(action.action_id)
+    
+    async def close_for_inactivity(self, guild: discord.Guild, action, inactivity_hours: float):
+        """Marca a ação como inativa, atualiza a mensagem e notifica o escalador"""
+        # Marca como inativa; um resultado definido enquanto o lote era
+        # processado vence, e aí não há o que editar nem avisar
+        if not await self.action_service.set_inactivity(action.action_id):
+            return
+        
+        # Atualiza mensagem (sem botões, pois a ação tem resultado)
+        self.bot.edit_coalescer.request(action.action_id)
+        print(f"⏰ Ação {action.action_id} marcada como INATIVA")
+        
+        # Notifica o escalador
+        if action.escalator_id:
+            try:
+                escalator = guild.get_member(action.escalator_id)
+                if escalator:
+                    embed = discord.Embed(
+                        title="⏰ Ação Marcada como Inativa",
+                        description=f"A ação **{action.action_name}** foi automaticamente marcada como **INATIVA** "
+                                   f"após {inactivity_hours}h sem resultado.",
+                        color=discord.Color.dark_purple()
+                    )
+                    self.notifications.notify(action.action_id, NotificationDispatcher.INACTIVITY,
+                                              escalator.id, partial(escalator.send, embed=embed))
+            except Exception as e:
+                print(f"Erro ao notificar inatividade: {e}")
     
     @check_inactivity.before_loop
     async def before_inactivity_check(self):
         """Aguarda o bot estar pronto antes de iniciar a task"""
         await self.bot.wait_until_ready()
     
-    @tasks.loop(time=time(hour=23, minute=59, tzinfo=pytz.timezone('America/Sao_Paulo')))
-    async def daily_reports(self):
-        """Envia relatórios diários automaticamente"""
-        print("📊 Gerando relatórios diários...")
-        
-        from cogs.reports import ReportsCog
-        reports_cog = self.bot.get_cog('ReportsCog')
-        if not reports_cog:
-            print("❌ ReportsCog não encontrado!")
-            return
-        
+    @tasks.loop(minutes=10)
+    async def evict_finished_actions(self):
+        """Tira da memória as ações finalizadas após o período de carência"""
+        self.action_service.evict_finished_actions()
+    
+    @evict_finished_actions.before_loop
+    async def before_evict_finished_actions(self):
+        """Aguarda o bot estar pronto antes de iniciar a task"""
+        await self.bot.wait_until_ready()
+    
+    def get_report_targets(self) -> List[Tuple[discord.Guild, discord.TextChannel]]:
+        """Servidores com canal de relatórios configurado e encontrado"""
+        targets = []
         for guild in self.bot.guilds:
             config = self.config_service.get_server_config(guild.id)
             report_channel_id = config.get('report_channel')
@@ -122,12 +134,42 @@ class TasksCog(commands.Cog):
             if not channel:
                 continue
             
-            try:
-                embed = await reports_cog.generate_daily_report(guild.id)
-                await channel.send(embed=embed)
+            targets.append((guild, channel))
+        return targets
+    
+    @tasks.loop(time=time(hour=23, minute=59, tzinfo=pytz.timezone('America/Sao_Paulo')))
+    async def daily_reports(self):
+        """Envia relatórios diários automaticamente"""
+        print("📊 Gerando relatórios diários...")
+        
+        from cogs.reports import ReportsCog
+        reports_cog = self.bot.get_cog('ReportsCog')
+        if not reports_cog:
+            print("❌ ReportsCog não encontrado!")
+            return
+        
+        targets = self.get_report_targets()
+        if not targets:
+            return
+        
+        # Todos os servidores calculados juntos, com uma leitura do histórico
+        try:
+            embeds = await reports_cog.generate_daily_reports([guild.id for guild, _ in targets])
+        except Exception as e:
+            print(f"❌ Erro ao gerar relatórios diários: {e}")
+            return
+        
+        # Envios em paralelo, limitados pelo dispatcher
+        jobs = [ReportJob(guild.id, channel.id, partial(channel.send, embed=embeds[guild.id]))
+                for guild, channel in targets]
+        results = await self.report_dispatcher.dispatch(jobs)
+        
+        for guild, _ in targets:
+            if results[guild.id]:
                 print(f"✅ Relatório diário enviado para {guild.name}")
-            except Exception as e:
-                print(f"❌ Erro ao enviar relatório diário para {guild.name}: {e}")
+            else:
+                error = self.report_dispatcher.last_errors.get(guild.id)
+                print(f"❌ Erro ao enviar relatório diário para {guild.name}: {error}")
     
     @daily_reports.before_loop
     async def before_daily_reports(self):
@@ -148,23 +190,28 @@ class TasksCog(commands.Cog):
             print("❌ ReportsCog não encontrado!")
             return
         
-        for guild in self.bot.guilds:
-            config = self.config_service.get_server_config(guild.id)
-            report_channel_id = config.get('report_channel')
-            
-            if not report_channel_id:
-                continue
-            
-            channel = guild.get_channel(report_channel_id)
-            if not channel:
-                continue
-            
-            try:
-                embed = await reports_cog.generate_weekly_report(guild.id)
-                await channel.send(embed=embed)
+        targets = self.get_report_targets()
+        if not targets:
+            return
+        
+        # Todos os servidores calculados juntos, com uma leitura do histórico
+        try:
+            embeds = await reports_cog.generate_weekly_reports([guild.id for guild, _ in targets])
+        except Exception as e:
+            print(f"❌ Erro ao gerar relatórios semanais: {e}")
+            return
+        
+        # Envios em paralelo, limitados pelo dispatcher
+        jobs = [ReportJob(guild.id, channel.id, partial(channel.send, embed=embeds[guild.id]))
+                for guild, channel in targets]
+        results = await self.report_dispatcher.dispatch(jobs)
+        
+        for guild, _ in targets:
+            if results[guild.id]:
                 print(f"✅ Relatório semanal enviado para {guild.name}")
-            except Exception as e:
-                print(f"❌ Erro ao enviar relatório semanal para {guild.name}: {e}")
+            else:
+                error = self.report_dispatcher.last_errors.get(guild.id)
+                print(f"❌ Erro ao enviar relatório semanal para {guild.name}: {error}")
     
     @weekly_reports.before_loop
     async def before_weekly_reports(self):
@@ -5,8 +5,11 @@ import os
 import asyncio
 from dotenv import load_dotenv # type: ignore
 
-from services import ActionService, ConfigService
-from cogs.action_views import setup_persistent_views
+from services import (ActionService, ConfigService, InactivityScheduler,
+                      StatsAggregator, ReportDispatcher, NotificationDispatcher,
+                      EditCoalescer, ActionMessageUpdater, InteractionRateLimiter,
+                      InteractionMetrics, OutboundScheduler)
+from cogs.action_views import setup_persistent_views, render_action_message
 
 # Carrega variáveis de ambiente
 load_dotenv()
@@ -29,8 +32,44 @@ class PoliceBot(commands.Bot):
         )
         
         # Inicializa serviços
-        self.action_service = ActionService(data_dir="data")
+        # Compressão dos meses congelados (só HISTORY_BACKEND=segments); "none" desliga
+        history_compression = os.getenv('HISTORY_COMPRESSION', 'gzip')
+        self.action_service = ActionService(
+            data_dir="data",
+            use_journal=True,
+            history_backend=os.getenv('HISTORY_BACKEND', 'json'),
+            history_compression=None if history_compression == 'none' else history_compression,
+            history_freeze_after_days=int(os.getenv('HISTORY_FREEZE_AFTER_DAYS', 7))
+        )
         self.config_service = ConfigService(data_dir="data")
+        self.inactivity_scheduler = InactivityScheduler(self.action_service, self.config_service)
+        self.stats_aggregator = StatsAggregator(self.action_service, data_dir="data")
+        # Todas as escritas no Discord disputam as mesmas vagas, por prioridade
+        self.outbound = OutboundScheduler(
+            max_concurrency=int(os.getenv('OUTBOUND_CONCURRENCY', 10))
+        )
+        self.report_dispatcher = ReportDispatcher(
+            max_concurrency=int(os.getenv('REPORT_CONCURRENCY', 5)),
+            jitter_seconds=float(os.getenv('REPORT_JITTER_SECONDS', 0)),
+            scheduler=self.outbound
+        )
+        self.notification_dispatcher = NotificationDispatcher(
+            workers=int(os.getenv('NOTIFICATION_WORKERS', 4)),
+            scheduler=self.outbound
+        )
+        self.message_updater = ActionMessageUpdater(self, self.action_service, self.outbound)
+        self.edit_coalescer = EditCoalescer(
+            render=lambda action_id: render_action_message(self, action_id),
+            edit=self.message_updater.edit
+        )
+        # Limite por (usuário, servidor, tipo): (rajada, tokens por segundo)
+        self.rate_limiter = InteractionRateLimiter(limits={
+            'join': (2, 0.5),
+            'leave': (2, 0.5),
+            'criar_acao': (2, 1 / 30),
+            'report': (3, 1 / 60)
+        })
+        self.interaction_metrics = InteractionMetrics()
     
     async def setup_hook(self):
         """Setup inicial do bot"""
@@ -59,6 +98,14 @@ class PoliceBot(commands.Bot):
         except Exception as e:
             print(f"❌ Erro ao sincronizar comandos: {e}")
     
+    async def close(self):
+        """Encerra o bot aguardando as escritas pendentes em disco"""
+        # DMs na fila saem antes de a conexão fechar
+        await self.notification_dispatcher.close()
+        await super().close()
+        await self.action_service.close()
+        self.stats_aggregator.close()
+    
     async def on_ready(self):
         """Chamado quando o bot está pronto"""
         print("=" * 50)
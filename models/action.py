@@ -53,6 +53,7 @@ class ActionData:
     # Metadados
     closed_by_id: Optional[int] = None  # Quem fechou
     result_set_by_id: Optional[int] = None  # Quem definiu o resultado
+    version: int = 0  # Incrementada pelo ActionService a cada mutação persistida
     
     def to_dict(self) -> Dict:
         """Converte para dicionário para salvar em JSON"""
@@ -116,6 +117,15 @@ class ActionData:
         delta = now - created
         return delta.total_seconds() / 3600
     
+    def get_hours_since_finished(self) -> float:
+        """Retorna horas desde a definição do resultado"""
+        if not self.finished_at:
+            return 0
+        finished = datetime.fromisoformat(self.finished_at)
+        now = datetime.now()
+        delta = now - finished
+        return delta.total_seconds() / 3600
+    
     def get_hours_since_closed(self) -> float:
         """Retorna horas desde o fechamento"""
         if not self.closed_at:
@@ -1,5 +1,17 @@
 # services/__init__.py
 from .action_service import ActionService
 from .config_service import ConfigService
+from .inactivity_scheduler import InactivityScheduler
+from .stats_aggregator import StatsAggregator
+from .report_dispatcher import ReportDispatcher, ReportJob
+from .notification_dispatcher import NotificationDispatcher
+from .edit_coalescer import EditCoalescer
+from .message_updater import ActionMessageUpdater
+from .rate_limiter import InteractionRateLimiter
+from .interaction_metrics import InteractionMetrics
+from .outbound_scheduler import OutboundScheduler
 
-__all__ = ['ActionService', 'ConfigService']
\ No newline at end of file
+__all__ = ['ActionService', 'ConfigService', 'InactivityScheduler', 'StatsAggregator',
+           'ReportDispatcher', 'ReportJob', 'NotificationDispatcher',
+           'EditCoalescer', 'ActionMessageUpdater', 'InteractionRateLimiter',
+           'InteractionMetrics', 'OutboundScheduler']
\ No newline at end of file
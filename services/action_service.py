@@ -1,10 +1,14 @@
 # services/action_service.py
 import json
 import os
-from typing import Optional, List, Dict
+from typing import Optional, List, Dict, Set, Tuple, Awaitable, Callable
 from datetime import datetime
+from concurrent.futures import Future
+from collections import OrderedDict
 import asyncio
 from models.action import ActionData, ActionStatus
+from .history_store import open_history_store
+from .persistence import PersistenceWriter, atomic_write_json
 
 
 class ActionService:
@@ -13,320 +17,871 @@ class ActionService:
     Responsável por toda a lógica de negócio e persistência
     """
     
-    def __init__(self, data_dir: str = "data"):
+    # Status sem resultado definido (candidatos à inatividade)
+    PENDING_STATUSES = [ActionStatus.ABERTA.value, ActionStatus.FECHADA.value,
+                        ActionStatus.CANCELADA.value]
+    
+    # Segundos até regravar um lote cuja escrita falhou
+    RETRY_AFTER_FAILURE = 5
+    
+    # Quantos IDs apagados são lembrados para barrar a camada fria
+    DELETED_IDS_LIMIT = 1024
+    
+    def __init__(self, data_dir: str = "data", use_journal: bool = False,
+                 snapshot_every: int = 200, history_backend: str = "json",
+                 flush_interval_ms: int = 250, flush_max_batch: int = 50,
+                 lock_stripes: int = 64, evict_after_hours: float = 1,
+                 cold_cache_size: int = 128, history_compression: Optional[str] = "gzip",
+                 history_freeze_after_days: int = 7):
         self.data_dir = data_dir
         self.active_file = os.path.join(data_dir, "active_actions.json")
-        self.history_file = os.path.join(data_dir, "actions_history.json")
+        self.journal_file = os.path.join(data_dir, "active_actions.journal")
         self.active_actions: Dict[str, ActionData] = {}
-        self._lock = asyncio.Lock()
+        
+        # Locks listrados por action_id: ações independentes (inclusive de
+        # servidores diferentes) mudam em paralelo; criação usa lock do servidor
+        self._lock_stripes = [asyncio.Lock() for _ in range(max(1, lock_stripes))]
+        self._guild_locks: Dict[int, asyncio.Lock] = {}
+        
+        # Modo journal: cada mutação vira uma linha no journal em vez de
+        # reescrever o snapshot inteiro; a cada N registros compacta
+        self.use_journal = use_journal
+        self.snapshot_every = snapshot_every
+        self._journal_entries = 0
+        self._needs_snapshot = False
+        
+        # Escritas em disco rodam fora do event loop, em ordem
+        self._writer = PersistenceWriter()
+        self._durable: Dict[str, Future] = {}
+        
+        # Coalescência: mutações só marcam a ação como suja; um flush a cada
+        # flush_interval_ms (ou ao juntar flush_max_batch ações) grava o lote
+        self.flush_interval_ms = flush_interval_ms
+        self.flush_max_batch = flush_max_batch
+        self._dirty_active: Set[str] = set()
+        self._dirty_history: Dict[str, ActionData] = {}
+        self._batch_future: Optional[Future] = None
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._closed = False
+        # IDs de ações montadas por new_action e ainda não registradas
+        self._reserved_ids: Set[str] = set()
+        
+        # Group commit: um flush forçado durante uma escrita em andamento
+        # entra no próximo lote, gravado assim que a escrita atual terminar
+        self._inflight: Optional[Future] = None
+        self._flush_after_inflight = False
+        
+        # Índices secundários (dicts como conjuntos ordenados de action_id),
+        # mantidos por _index_add/_index_remove/_set_status
+        self._guild_index: Dict[int, Dict[str, None]] = {}
+        self._status_index: Dict[str, Dict[str, None]] = {}
+        self._guild_status_index: Dict[Tuple[int, str], Dict[str, None]] = {}
+        
+        # Versão do histórico por servidor: sobe a cada gravação que toca o
+        # servidor, para caches de relatório saberem quando estão velhos
+        self._history_versions: Dict[int, int] = {}
+        
+        # Observadores de transições de estado (created, closed, reopened,
+        # finished, updated, deleted) e de toda gravação no histórico
+        # (history), chamados com (evento, ação)
+        self._listeners: List[Callable[[str, ActionData], None]] = []
+        
+        # Camada fria: ações finalizadas saem de active_actions após
+        # evict_after_hours; consultas tardias são servidas do histórico
+        # através de um LRU pequeno
+        self.evict_after_hours = evict_after_hours
+        self.cold_cache_size = cold_cache_size
+        self._cold_cache: "OrderedDict[str, ActionData]" = OrderedDict()
+        # IDs que não estão na camada fria (inexistentes, apagados ou sem
+        # resultado), para não reler o histórico a cada consulta
+        self._cold_misses: "OrderedDict[str, None]" = OrderedDict()
+        # Apagadas recentemente (LRU): o registro no histórico não as ressuscita
+        self._deleted_ids: "OrderedDict[str, None]" = OrderedDict()
         
         # Cria diretório de dados se não existir
         os.makedirs(data_dir, exist_ok=True)
         
+        # Backend do histórico: "json" (arquivo único), "sqlite" (indexado)
+        # ou "segments" (um arquivo por dia, meses antigos comprimidos)
+        self.history_store = open_history_store(history_backend, data_dir,
+                                                history_compression, history_freeze_after_days)
+        
         # Carrega ações ativas
         self.load_active_actions()
+        self.evict_finished_actions()
     
     def load_active_actions(self):
         """Carrega ações ativas do arquivo"""
+        snapshot_ok = True
         if os.path.exists(self.active_file):
             try:
                 with open(self.active_file, 'r', encoding='utf-8') as f:
                     data = json.load(f)
                     for action_id, action_dict in data.items():
                         self.active_actions[action_id] = ActionData.from_dict(action_dict)
-                print(f"✅ {len(self.active_actions)} ações ativas carregadas")
             except Exception as e:
+                snapshot_ok = False
                 print(f"❌ Erro ao carregar ações ativas: {e}")
+        
+        # Aplica o journal gravado depois do último snapshot (mesmo com o
+        # modo desligado, para não perder mutações de uma execução anterior)
+        replayed = self._replay_journal()
+        if replayed:
+            print(f"✅ {replayed} registros do journal aplicados")
+            # Só compacta se o snapshot foi lido; senão sobrescreveria dados
+            if snapshot_ok:
+                self.save_active_actions()
+        
+        self._rebuild_indexes()
+        print(f"✅ {len(self.active_actions)} ações ativas carregadas")
     
-    def save_active_actions(self):
-        """Salva ações ativas no arquivo"""
+    def _rebuild_indexes(self):
+        """Reconstrói os índices secundários a partir das ações ativas"""
+        self._guild_index.clear()
+        self._status_index.clear()
+        self._guild_status_index.clear()
+        for action in self.active_actions.values():
+            self._index_add(action)
+    
+    def _index_add(self, action: ActionData):
+        """Inclui a ação nos índices por servidor e status"""
+        self._guild_index.setdefault(action.guild_id, {})[action.action_id] = None
+        self._status_index.setdefault(action.status, {})[action.action_id] = None
+        self._guild_status_index.setdefault((action.guild_id, action.status), {})[action.action_id] = None
+    
+    def _index_remove(self, action: ActionData):
+        """Retira a ação dos índices por servidor e status"""
+        for index, key in ((self._guild_index, action.guild_id),
+                           (self._status_index, action.status),
+                           (self._guild_status_index, (action.guild_id, action.status))):
+            bucket = index.get(key)
+            if bucket is None:
+                continue
+            bucket.pop(action.action_id, None)
+            if not bucket:
+                del index[key]
+    
+    def _set_status(self, action: ActionData, status: str):
+        """Altera o status mantendo os índices corretos"""
+        if action.status == status:
+            return
+        self._index_remove(action)
+        action.status = status
+        self._index_add(action)
+    
+    def _indexed_actions(self, statuses: List[str],
+                         guild_id: Optional[int] = None) -> List[ActionData]:
+        """Ações ativas com um dos status (opcionalmente de um servidor)"""
+        actions = []
+        for status in statuses:
+            if guild_id is None:
+                bucket = self._status_index.get(status, {})
+            else:
+                bucket = self._guild_status_index.get((guild_id, status), {})
+            actions.extend(self.active_actions[action_id] for action_id in bucket)
+        return actions
+    
+    def _replay_journal(self) -> int:
+        """Reaplica o journal sobre o snapshot carregado"""
+        if not os.path.exists(self.journal_file):
+            return 0
+        
+        replayed = 0
         try:
-            data = {action_id: action.to_dict() 
-                   for action_id, action in self.active_actions.items()}
-            with open(self.active_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
+            with open(self.journal_file, 'r', encoding='utf-8') as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        # Última linha truncada por queda no meio da escrita
+                        print("⚠️ Registro inválido no journal ignorado")
+                        continue
+                    
+                    if record['op'] == 'put':
+                        self.active_actions[record['id']] = ActionData.from_dict(record['data'])
+                    elif record['op'] == 'del':
+                        self.active_actions.pop(record['id'], None)
+                    replayed += 1
         except Exception as e:
-            print(f"❌ Erro ao salvar ações ativas: {e}")
+            print(f"❌ Erro ao reaplicar journal: {e}")
+        return replayed
+    
+    def _journal_lines(self, action_ids: List[str]) -> List[str]:
+        """Serializa um registro do journal por ação (put ou del)"""
+        lines = []
+        for action_id in action_ids:
+            action = self.active_actions.get(action_id)
+            if action:
+                record = {'op': 'put', 'id': action_id, 'data': action.to_dict()}
+            else:
+                record = {'op': 'del', 'id': action_id}
+            lines.append(json.dumps(record, ensure_ascii=False, separators=(',', ':')))
+        return lines
     
-    def save_to_history(self, action: ActionData):
-        """Salva ação no histórico"""
+    def _write_journal_lines(self, lines: List[str]):
+        """Acrescenta um lote de linhas ao journal (thread de escrita)"""
         try:
-            history = []
-            if os.path.exists(self.history_file):
-                with open(self.history_file, 'r', encoding='utf-8') as f:
-                    history = json.load(f)
-            
-            # Atualiza ou adiciona
-            action_dict = action.to_dict()
-            existing_idx = next((i for i, h in enumerate(history) 
-                               if h['action_id'] == action.action_id), None)
+            with open(self.journal_file, 'a', encoding='utf-8') as f:
+                f.write("".join(line + "\n" for line in lines))
+        except Exception:
+            # Sem journal confiável, o próximo flush grava um snapshot
+            self._needs_snapshot = True
+            raise
+    
+    def _schedule_snapshot(self) -> Future:
+        """Agenda um snapshot completo na thread de escrita"""
+        data = {action_id: action.to_dict() 
+               for action_id, action in self.active_actions.items()}
+        self._journal_entries = 0
+        self._needs_snapshot = False
+        return self._submit_write(self._write_snapshot, data, "Erro ao salvar ações ativas")
+    
+    def _write_snapshot(self, data: Dict):
+        """Grava o snapshot e compacta o journal"""
+        try:
+            atomic_write_json(self.active_file, data, indent=2, ensure_ascii=False)
             
-            if existing_idx is not None:
-                history[existing_idx] = action_dict
+            # O snapshot já contém tudo que estava no journal
+            if os.path.exists(self.journal_file):
+                open(self.journal_file, 'w', encoding='utf-8').close()
+        except Exception:
+            # O snapshot é refeito no próximo flush
+            self._needs_snapshot = True
+            raise
+    
+    def _submit_write(self, fn: Callable, data, error_message: str) -> Future:
+        """
+        Envia uma escrita para a thread; a falha fica no Future (e chega ao
+        lote e ao durable()) e é registrada no log quando ele conclui
+        """
+        future = self._writer.submit(fn, data)
+        
+        def _log(f: Future):
+            if f.exception() is not None:
+                print(f"❌ {error_message}: {f.exception()}")
+        
+        future.add_done_callback(_log)
+        return future
+    
+    def _persist(self, action_id: str, history: bool = True,
+                 force: bool = False) -> Future:
+        """
+        Marca a ação como suja; o flush grava o lote inteiro de uma vez
+        Retorna o Future do lote, concluído quando tudo estiver no disco
+        """
+        self._dirty_active.add(action_id)
+        action = self.active_actions.get(action_id)
+        if action:
+            action.version += 1
+        if history and action:
+            self._mark_history(action)
+        
+        return self._schedule_flush(action_id, force)
+    
+    def _mark_history(self, action: ActionData):
+        """
+        Coloca a ação no próximo lote do histórico e avisa os observadores
+        (evento "history"), inclusive nas mutações sem evento próprio
+        """
+        self._dirty_history[action.action_id] = action
+        self._bump_history_version(action.guild_id)
+        self._notify("history", action)
+    
+    def _bump_history_version(self, guild_id: int):
+        self._history_versions[guild_id] = self._history_versions.get(guild_id, 0) + 1
+    
+    def history_version(self, guild_id: int) -> int:
+        """Versão atual do histórico do servidor"""
+        return self._history_versions.get(guild_id, 0)
+    
+    def _schedule_flush(self, action_id: str, force: bool) -> Future:
+        """Agenda o flush do lote atual (imediato se forçado ou cheio)"""
+        if self._batch_future is None:
+            self._batch_future = Future()
+        batch = self._batch_future
+        self._track_durable(action_id, batch)
+        
+        dirty_count = len(self._dirty_active) + len(self._dirty_history)
+        if force or dirty_count >= self.flush_max_batch:
+            if self._inflight is not None and not self._inflight.done():
+                self._flush_after_inflight = True
             else:
-                history.append(action_dict)
-            
-            with open(self.history_file, 'w', encoding='utf-8') as f:
-                json.dump(history, f, indent=2, ensure_ascii=False)
+                self._flush_dirty()
+            return batch
+        
+        if self._flush_handle is None:
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                # Fora do event loop não há timer: grava na hora
+                self._flush_dirty()
+                return batch
+            self._flush_handle = loop.call_later(self.flush_interval_ms / 1000,
+                                                 self._flush_dirty)
+        return batch
+    
+    def _flush_dirty(self):
+        """Serializa as ações sujas e envia um único lote para a thread de escrita"""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        
+        batch = self._batch_future
+        self._batch_future = None
+        if batch is None:
+            return
+        
+        dirty_active = list(self._dirty_active)
+        dirty_history = list(self._dirty_history.values())
+        self._dirty_active.clear()
+        self._dirty_history.clear()
+        
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+        
+        active_future = history_future = None
+        if dirty_active:
+            if not self.use_journal or self._needs_snapshot or \
+                    self._journal_entries + len(dirty_active) > self.snapshot_every:
+                active_future = self._schedule_snapshot()
+            else:
+                lines = self._journal_lines(dirty_active)
+                self._journal_entries += len(lines)
+                active_future = self._submit_write(self._write_journal_lines, lines,
+                                                   "Erro ao gravar journal")
+        
+        if dirty_history:
+            records = [action.to_dict() for action in dirty_history]
+            history_future = self._submit_write(self._write_history, records,
+                                                "Erro ao salvar no histórico")
+        
+        futures = [f for f in (active_future, history_future) if f is not None]
+        if not futures:
+            batch.set_result(None)
+            return
+        
+        # A thread é FIFO: quando a última escrita conclui, as anteriores também
+        # concluíram; o que falhou volta para o próximo lote e a falha chega a
+        # quem aguarda o durable()
+        def _settle(f: Future):
+            failed_active = dirty_active if active_future is not None and \
+                active_future.exception() is not None else []
+            failed_history = dirty_history if history_future is not None and \
+                history_future.exception() is not None else []
+            if failed_active or failed_history:
+                if loop is not None:
+                    loop.call_soon_threadsafe(self._requeue_failed, failed_active, failed_history)
+                else:
+                    self._requeue_failed(failed_active, failed_history)
+                batch.set_exception((active_future if failed_active else history_future).exception())
+            else:
+                batch.set_result(None)
+        
+        futures[-1].add_done_callback(_settle)
+        
+        if loop is None:
+            return
+        self._inflight = batch
+        batch.add_done_callback(lambda f: loop.call_soon_threadsafe(self._after_inflight, f))
+    
+    def _requeue_failed(self, action_ids: List[str], history: List[ActionData]):
+        """Devolve ao próximo lote as ações de uma escrita que falhou"""
+        if action_ids:
+            # O journal pode ter ficado incompleto: a nova tentativa é um snapshot
+            self._needs_snapshot = True
+            self._dirty_active.update(action_ids)
+        for action in history:
+            # Uma versão mais nova já enfileirada prevalece
+            self._dirty_history.setdefault(action.action_id, action)
+        
+        if self._batch_future is None:
+            self._batch_future = Future()
+        for action_id in set(action_ids) | {action.action_id for action in history}:
+            self._track_durable(action_id, self._batch_future)
+        
+        if self._closed or self._flush_handle is not None:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        self._flush_handle = loop.call_later(self.RETRY_AFTER_FAILURE, self._flush_dirty)
+    
+    async def _wait_durable(self, action_id: str):
+        """
+        Aguarda a gravação de uma transição já aplicada em memória; uma falha
+        não é repassada a quem chamou, pois o lote volta para a fila e é regravado
+        """
+        try:
+            await self.durable(action_id)
         except Exception as e:
-            print(f"❌ Erro ao salvar no histórico: {e}")
+            print(f"⚠️ Gravação da ação {action_id} falhou, nova tentativa em "
+                  f"{self.RETRY_AFTER_FAILURE}s: {e}")
     
-    def load_history(self, days: Optional[int] = None) -> List[ActionData]:
+    def _after_inflight(self, batch: Future):
+        """Grava os flushes forçados que chegaram durante a escrita anterior"""
+        if self._inflight is batch:
+            self._inflight = None
+        if self._flush_after_inflight:
+            self._flush_after_inflight = False
+            self._flush_dirty()
+    
+    def _track_durable(self, action_id: str, future: Future):
+        """Guarda o lote pendente de cada ação"""
+        self._durable[action_id] = future
+        
+        def _done(f: Future):
+            if self._durable.get(action_id) is f:
+                self._durable.pop(action_id, None)
+        
+        future.add_done_callback(_done)
+    
+    def durable(self, action_id: str) -> Awaitable:
+        """Aguardável que conclui quando a última mutação da ação estiver no disco"""
+        future = self._durable.get(action_id)
+        if future is None:
+            future = Future()
+            future.set_result(None)
+        return asyncio.wrap_future(future)
+    
+    async def flush(self):
+        """Grava o lote sujo agora e aguarda todas as escritas pendentes"""
+        self._flush_dirty()
+        await self._writer.drain()
+    
+    async def close(self):
+        """Grava o que falta e encerra a thread de escrita"""
+        self._closed = True
+        self._flush_dirty()
+        await self._writer.close()
+    
+    def save_active_actions(self):
+        """Salva snapshot das ações ativas e compacta o journal (síncrono)"""
+        data = {action_id: action.to_dict() 
+               for action_id, action in self.active_actions.items()}
+        self._journal_entries = 0
+        try:
+            self._write_snapshot(data)
+        except Exception as e:
+            print(f"❌ Erro ao salvar ações ativas: {e}")
+    
+    def save_action(self, action: ActionData) -> Future:
+        """Persiste uma ação alterada fora dos métodos do service"""
+        if action.action_id in self.active_actions:
+            future = self._persist(action.action_id)
+        else:
+            action.version += 1
+            self._mark_history(action)
+            future = self._schedule_flush(action.action_id, force=False)
+        self._notify("updated", action)
+        return future
+    
+    def save_to_history(self, action: ActionData) -> Future:
+        """Agenda a gravação da ação no histórico (no próximo lote)"""
+        self._mark_history(action)
+        return self._schedule_flush(action.action_id, force=False)
+    
+    def _write_history(self, records: List[Dict]):
+        """Grava um lote de ações no histórico (thread de escrita)"""
+        self.history_store.save_many(records)
+    
+    def load_history(self, days: Optional[int] = None,
+                     guild_id: Optional[int] = None) -> List[ActionData]:
         """Carrega histórico de ações"""
-        if not os.path.exists(self.history_file):
+        try:
+            return [ActionData.from_dict(h) 
+                   for h in self.history_store.load(days=days, guild_id=guild_id)]
+        except Exception as e:
+            print(f"❌ Erro ao carregar histórico: {e}")
             return []
-        
+    
+    def load_history_between(self, start: str, end: str,
+                             guild_id: Optional[int] = None) -> List[ActionData]:
+        """Carrega ações criadas em [start, end) (datas ISO)"""
         try:
-            with open(self.history_file, 'r', encoding='utf-8') as f:
-                history = json.load(f)
-            
-            actions = [ActionData.from_dict(h) for h in history]
-            
-            # Filtra por data se especificado
-            if days:
-                cutoff = datetime.now().timestamp() - (days * 24 * 3600)
-                actions = [a for a in actions 
-                          if datetime.fromisoformat(a.created_at).timestamp() >= cutoff]
-            
-            return actions
+            return [ActionData.from_dict(h)
+                   for h in self.history_store.load_between(start, end, guild_id=guild_id)]
         except Exception as e:
             print(f"❌ Erro ao carregar histórico: {e}")
             return []
     
+    def pending_history(self) -> List[ActionData]:
+        """Ações alteradas que ainda não foram para a fila de escrita do histórico"""
+        return list(self._dirty_history.values())
+    
+    def add_listener(self, callback: Callable[[str, ActionData], None]):
+        """Registra um observador das transições de estado das ações"""
+        self._listeners.append(callback)
+    
+    def _notify(self, event: str, action: ActionData):
+        """Avisa os observadores; uma falha em um não afeta a mutação"""
+        for callback in self._listeners:
+            try:
+                callback(event, action)
+            except Exception as e:
+                print(f"❌ Erro ao notificar evento '{event}': {e}")
+    
+    def _action_lock(self, action_id: str) -> asyncio.Lock:
+        """Retorna o lock da faixa da ação"""
+        return self._lock_stripes[hash(action_id) % len(self._lock_stripes)]
+    
+    def _guild_lock(self, guild_id: int) -> asyncio.Lock:
+        """Retorna o lock de criação do servidor"""
+        lock = self._guild_locks.get(guild_id)
+        if lock is None:
+            lock = self._guild_locks[guild_id] = asyncio.Lock()
+        return lock
+    
     async def create_action(self, guild_id: int, action_name: str, 
                            action_type: str, config: Dict,
-                           channel_id: int, message_id: int) -> ActionData:
+                           channel_id: int, message_id: Optional[int] = None) -> ActionData:
         """Cria uma nova ação"""
-        async with self._lock:
-            # Gera ID único
-            action_id = f"{guild_id}_{int(datetime.now().timestamp() * 1000)}"
-            
-            # Cria objeto ActionData
-            action = ActionData(
-                action_id=action_id,
-                guild_id=guild_id,
-                action_name=action_name,
-                action_type=action_type,
-                channel_id=channel_id,
-                message_id=message_id,
-                max_participants=config.get('max_participants', 10),
-                has_call_p1=config.get('has_call_p1', True),
-                has_call_p2=config.get('has_call_p2', False),
-                required_roles=config.get('required_roles', False),
-                display_name=config.get('display_name', action_name)
-            )
+        action = await self.new_action(guild_id, action_name, action_type, config, channel_id)
+        return await self.register_action(action, message_id)
+    
+    async def new_action(self, guild_id: int, action_name: str, action_type: str,
+                         config: Dict, channel_id: int) -> ActionData:
+        """
+        Monta uma ação com ID reservado, sem gravar nem avisar ninguém
+        Ela só passa a existir em register_action (ou é descartada com discard_action)
+        """
+        async with self._guild_lock(guild_id):
+            # Gera ID único (o lock do servidor evita colisão no mesmo ms)
+            timestamp_ms = int(datetime.now().timestamp() * 1000)
+            action_id = f"{guild_id}_{timestamp_ms}"
+            while action_id in self.active_actions or action_id in self._reserved_ids:
+                timestamp_ms += 1
+                action_id = f"{guild_id}_{timestamp_ms}"
+            self._reserved_ids.add(action_id)
+        
+        return ActionData(
+            action_id=action_id,
+            guild_id=guild_id,
+            action_name=action_name,
+            action_type=action_type,
+            channel_id=channel_id,
+            max_participants=config.get('max_participants', 10),
+            has_call_p1=config.get('has_call_p1', True),
+            has_call_p2=config.get('has_call_p2', False),
+            required_roles=config.get('required_roles', False),
+            display_name=config.get('display_name', action_name)
+        )
+    
+    async def register_action(self, action: ActionData,
+                              message_id: Optional[int] = None) -> ActionData:
+        """Registra uma ação montada por new_action, já com a mensagem publicada"""
+        async with self._guild_lock(action.guild_id):
+            self._reserved_ids.discard(action.action_id)
+            if message_id is not None:
+                action.message_id = message_id
             
             # Adiciona às ações ativas
-            self.active_actions[action_id] = action
+            self.active_actions[action.action_id] = action
+            self._index_add(action)
             
-            # Salva
-            self.save_active_actions()
-            self.save_to_history(action)
+            # Salva (ativas e histórico no mesmo lote)
+            self._persist(action.action_id)
+            self._notify("created", action)
             
             return action
     
+    def discard_action(self, action: ActionData):
+        """Libera o ID de uma ação montada que não chegou a ser registrada"""
+        self._reserved_ids.discard(action.action_id)
+    
     def get_action(self, action_id: str) -> Optional[ActionData]:
-        """Retorna uma ação pelo ID"""
-        return self.active_actions.get(action_id)
+        """Retorna uma ação pelo ID (ativas primeiro, depois a camada fria)"""
+        action = self.active_actions.get(action_id)
+        if action:
+            return action
+        return self._get_cold_action(action_id)
+    
+    def _get_cold_action(self, action_id: str) -> Optional[ActionData]:
+        """
+        Busca uma ação já removida das ativas no LRU ou no histórico
+        Só ações com resultado (movidas pela evicção) fazem parte da camada
+        fria; uma ação apagada continua no histórico, mas não existe mais
+        """
+        action = self._cold_cache.get(action_id)
+        if action:
+            self._cold_cache.move_to_end(action_id)
+            return action
+        
+        if action_id in self._cold_misses or action_id in self._deleted_ids:
+            return None
+        
+        # Ainda na fila de escrita do histórico
+        action = self._dirty_history.get(action_id)
+        if action and action.has_result():
+            return action
+        
+        try:
+            record = self.history_store.get(action_id)
+        except Exception as e:
+            print(f"❌ Erro ao buscar ação no histórico: {e}")
+            return None
+        
+        action = ActionData.from_dict(record) if record else None
+        if not action or not action.has_result():
+            self._remember_cold_miss(action_id)
+            return None
+        
+        self._cold_cache[action_id] = action
+        if len(self._cold_cache) > self.cold_cache_size:
+            self._cold_cache.popitem(last=False)
+        return action
+    
+    def _remember_cold_miss(self, action_id: str):
+        self._cold_misses[action_id] = None
+        while len(self._cold_misses) > self.cold_cache_size:
+            self._cold_misses.popitem(last=False)
+    
+    def _remember_deleted(self, action_id: str):
+        self._deleted_ids[action_id] = None
+        while len(self._deleted_ids) > self.DELETED_IDS_LIMIT:
+            self._deleted_ids.popitem(last=False)
+    
+    def evict_finished_actions(self) -> int:
+        """
+        Move para a camada fria as ações com resultado há mais de
+        evict_after_hours; retorna quantas foram removidas
+        """
+        evicted = []
+        for action_id, action in list(self.active_actions.items()):
+            if not action.has_result():
+                continue
+            if action.get_hours_since_finished() < self.evict_after_hours:
+                continue
+            # Ação em plena mutação: fica para a próxima rodada
+            if self._action_lock(action_id).locked():
+                continue
+            
+            del self.active_actions[action_id]
+            self._index_remove(action)
+            self._cold_cache[action_id] = action
+            self._cold_misses.pop(action_id, None)
+            # Regrava no histórico junto com a remoção: a camada fria nunca
+            # depende de uma escrita anterior que possa ter falhado
+            self._dirty_history[action_id] = action
+            self._persist(action_id, history=False)
+            evicted.append(action_id)
+        
+        while len(self._cold_cache) > self.cold_cache_size:
+            self._cold_cache.popitem(last=False)
+        
+        if evicted:
+            print(f"🧊 {len(evicted)} ações finalizadas movidas para o histórico")
+        return len(evicted)
     
     def get_guild_actions(self, guild_id: int, 
                          include_closed: bool = False) -> List[ActionData]:
         """Retorna todas as ações de um servidor"""
-        actions = [a for a in self.active_actions.values() 
-                  if a.guild_id == guild_id]
-        
-        if not include_closed:
-            actions = [a for a in actions if a.is_open()]
+        if include_closed:
+            ids = self._guild_index.get(guild_id, {})
+        else:
+            ids = self._guild_status_index.get((guild_id, ActionStatus.ABERTA.value), {})
         
+        actions = [self.active_actions[action_id] for action_id in ids]
+        # Mantém a ordem de criação (reabrir move a ação no índice)
+        actions.sort(key=lambda a: a.created_at)
         return actions
     
     async def set_escalator(self, action_id: str, user_id: int) -> bool:
         """Define o escalador da ação"""
-        async with self._lock:
-            action = self.get_action(action_id)
+        async with self._action_lock(action_id):
+            action = self.active_actions.get(action_id)
             if not action or action.escalator_id:
                 return False
             
             action.escalator_id = user_id
-            self.save_active_actions()
-            self.save_to_history(action)
+            self._persist(action_id)
             return True
     
     async def set_call_p1(self, action_id: str, user_id: int) -> bool:
         """Define o Call P1"""
-        async with self._lock:
-            action = self.get_action(action_id)
+        async with self._action_lock(action_id):
+            action = self.active_actions.get(action_id)
             if not action or action.call_p1_id or not action.has_call_p1:
                 return False
             
             action.call_p1_id = user_id
             # NÃO adiciona automaticamente aos participantes
-            self.save_active_actions()
-            self.save_to_history(action)
+            self._persist(action_id)
             return True
     
     async def set_call_p2(self, action_id: str, user_id: int) -> bool:
         """Define o Call P2"""
-        async with self._lock:
-            action = self.get_action(action_id)
+        async with self._action_lock(action_id):
+            action = self.active_actions.get(action_id)
             if not action or action.call_p2_id or not action.has_call_p2:
                 return False
             
             action.call_p2_id = user_id
             # NÃO adiciona automaticamente aos participantes
-            self.save_active_actions()
-            self.save_to_history(action)
+            self._persist(action_id)
             return True
     
     async def add_participant(self, action_id: str, user_id: int) -> bool:
         """Adiciona participante"""
-        async with self._lock:
-            action = self.get_action(action_id)
+        async with self._action_lock(action_id):
+            action = self.active_actions.get(action_id)
             if not action or not action.is_open():
                 return False
             
             success = action.add_participant(user_id)
             if success:
-                self.save_active_actions()
-                self.save_to_history(action)
+                self._persist(action_id)
             return success
     
     async def remove_participant(self, action_id: str, user_id: int) -> bool:
         """Remove participante"""
-        async with self._lock:
-            action = self.get_action(action_id)
+        async with self._action_lock(action_id):
+            action = self.active_actions.get(action_id)
             if not action:
                 return False
             
             success = action.remove_participant(user_id)
             if success:
-                self.save_active_actions()
-                self.save_to_history(action)
+                self._persist(action_id)
             return success
     
     async def close_action(self, action_id: str, closed_by_id: int) -> bool:
         """Fecha a ação"""
-        async with self._lock:
-            action = self.get_action(action_id)
+        async with self._action_lock(action_id):
+            action = self.active_actions.get(action_id)
             if not action or not action.is_open():
                 return False
             
-            action.status = ActionStatus.FECHADA.value
+            self._set_status(action, ActionStatus.FECHADA.value)
             action.closed_at = datetime.now().isoformat()
             action.closed_by_id = closed_by_id
             
-            self.save_active_actions()
-            self.save_to_history(action)
+            # Transição de estado: grava já, sem esperar o lote
+            self._persist(action_id, force=True)
+            self._notify("closed", action)
+            
+            # Transições de estado só liberam a ação depois de gravadas
+            await self._wait_durable(action_id)
             return True
     
     async def reopen_action(self, action_id: str) -> bool:
         """Reabre uma ação fechada"""
-        async with self._lock:
-            action = self.get_action(action_id)
+        async with self._action_lock(action_id):
+            action = self.active_actions.get(action_id)
             if not action or action.has_result():
                 return False
             
-            action.status = ActionStatus.ABERTA.value
+            self._set_status(action, ActionStatus.ABERTA.value)
             action.closed_at = None
             action.closed_by_id = None
             
-            self.save_active_actions()
-            self.save_to_history(action)
+            self._persist(action_id)
+            self._notify("reopened", action)
             return True
     
     async def set_result(self, action_id: str, result: str, 
                         set_by_id: int) -> bool:
         """Define resultado da ação"""
-        async with self._lock:
-            action = self.get_action(action_id)
+        async with self._action_lock(action_id):
+            action = self.active_actions.get(action_id)
             if not action or not action.can_set_result():
                 return False
             
             if result == "victory":
-                action.status = ActionStatus.VITORIA.value
+                self._set_status(action, ActionStatus.VITORIA.value)
             elif result == "defeat":
-                action.status = ActionStatus.DERROTA.value
+                self._set_status(action, ActionStatus.DERROTA.value)
             else:
                 return False
             
             action.finished_at = datetime.now().isoformat()
             action.result_set_by_id = set_by_id
             
-            self.save_active_actions()
-            self.save_to_history(action)
+            self._persist(action_id, force=True)
+            self._notify("finished", action)
+            await self._wait_durable(action_id)
             return True
     
     async def force_result(self, action_id: str, result: str, 
                           set_by_id: int) -> bool:
         """Força resultado mesmo sem estar fechada (admin)"""
-        async with self._lock:
-            action = self.get_action(action_id)
+        async with self._action_lock(action_id):
+            action = self.active_actions.get(action_id)
             if not action or action.has_result():
                 return False
             
             # Fecha primeiro se estiver aberta
             if action.is_open():
-                action.status = ActionStatus.FECHADA.value
+                self._set_status(action, ActionStatus.FECHADA.value)
                 action.closed_at = datetime.now().isoformat()
                 action.closed_by_id = set_by_id
             
             # Define resultado
             if result == "victory":
-                action.status = ActionStatus.VITORIA.value
+                self._set_status(action, ActionStatus.VITORIA.value)
             elif result == "defeat":
-                action.status = ActionStatus.DERROTA.value
+                self._set_status(action, ActionStatus.DERROTA.value)
             else:
                 return False
             
             action.finished_at = datetime.now().isoformat()
             action.result_set_by_id = set_by_id
             
-            self.save_active_actions()
-            self.save_to_history(action)
+            self._persist(action_id, force=True)
+            self._notify("finished", action)
+            await self._wait_durable(action_id)
             return True
     
     async def set_inactivity(self, action_id: str) -> bool:
         """Define ação como inativa"""
-        async with self._lock:
-            action = self.get_action(action_id)
+        async with self._action_lock(action_id):
+            action = self.active_actions.get(action_id)
             if not action or action.has_result():
                 return False
             
-            action.status = ActionStatus.INATIVIDADE.value
+            self._set_status(action, ActionStatus.INATIVIDADE.value)
             action.finished_at = datetime.now().isoformat()
             
-            self.save_active_actions()
-            self.save_to_history(action)
+            self._persist(action_id, force=True)
+            self._notify("finished", action)
+            await self._wait_durable(action_id)
             return True
     
     async def mark_inactivity_warning(self, action_id: str) -> bool:
         """Marca que o aviso de inatividade foi enviado"""
-        async with self._lock:
-            action = self.get_action(action_id)
+        async with self._action_lock(action_id):
+            action = self.active_actions.get(action_id)
             if not action:
                 return False
             
             action.inactivity_warned_at = datetime.now().isoformat()
-            self.save_active_actions()
+            self._persist(action_id, history=False)
             return True
     
     async def delete_action(self, action_id: str) -> bool:
         """Remove ação das ações ativas"""
-        async with self._lock:
+        async with self._action_lock(action_id):
+            self._cold_cache.pop(action_id, None)
             if action_id in self.active_actions:
-                del self.active_actions[action_id]
-                self.save_active_actions()
+                action = self.active_actions.pop(action_id)
+                self._index_remove(action)
+                self._remember_deleted(action_id)
+                self._persist(action_id, history=False, force=True)
+                self._notify("deleted", action)
+                await self._wait_durable(action_id)
                 return True
             return False
     
-    def get_actions_needing_inactivity_check(self, hours: float = 20) -> List[ActionData]:
+    def get_actions_needing_inactivity_check(self, hours: float = 20,
+                                             guild_id: Optional[int] = None) -> List[ActionData]:
         """Retorna ações que precisam de aviso de inatividade"""
         actions = []
-        for action in self.active_actions.values():
-            # Ignora ações já finalizadas
-            if action.has_result():
-                continue
-            
+        for action in self._indexed_actions(self.PENDING_STATUSES, guild_id):
             # Verifica se está aberta há mais de X horas
             if action.get_hours_since_creation() >= hours:
                 # Se já foi avisado, ignora
@@ -336,14 +891,11 @@ class ActionService:
         
         return actions
     
-    def get_actions_needing_inactivity_close(self, hours: float = 24) -> List[ActionData]:
+    def get_actions_needing_inactivity_close(self, hours: float = 24,
+                                             guild_id: Optional[int] = None) -> List[ActionData]:
         """Retorna ações que devem ser fechadas por inatividade"""
         actions = []
-        for action in self.active_actions.values():
-            # Ignora ações já finalizadas
-            if action.has_result():
-                continue
-            
+        for action in self._indexed_actions(self.PENDING_STATUSES, guild_id):
             # Verifica se está aberta há mais de X horas
             if action.get_hours_since_creation() >= hours:
                 actions.append(action)
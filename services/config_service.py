@@ -1,7 +1,7 @@
 # services/config_service.py
 import json
 import os
-from typing import Dict, List, Optional
+from typing import Dict, FrozenSet, List, Optional, Callable
 
 
 class ConfigService:
@@ -16,8 +16,15 @@ class ConfigService:
         
         os.makedirs(data_dir, exist_ok=True)
         
+        # Observadores de alterações, chamados com (guild_id, chave)
+        self._listeners: List[Callable[[int, str], None]] = []
+        
         self.server_configs = self._load_configs()
         self.action_types = self._load_action_types()
+        
+        # Canais de ações de todos os servidores, para o filtro do on_message
+        self.action_channels: FrozenSet[int] = frozenset()
+        self._rebuild_action_channels()
     
     def _load_configs(self) -> Dict:
         """Carrega configurações dos servidores"""
@@ -31,6 +38,29 @@ class ConfigService:
         with open(self.config_file, 'w', encoding='utf-8') as f:
             json.dump(self.server_configs, f, indent=2, ensure_ascii=False)
     
+    def _rebuild_action_channels(self):
+        """Recalcula o conjunto de canais de ações configurados"""
+        self.action_channels = frozenset(
+            config["action_channel"] for config in self.server_configs.values()
+            if config.get("action_channel")
+        )
+    
+    def is_action_channel(self, channel_id: int) -> bool:
+        """Verifica se o canal é o canal de ações de algum servidor (sem I/O)"""
+        return channel_id in self.action_channels
+    
+    def add_listener(self, callback: Callable[[int, str], None]):
+        """Registra um observador de alterações de configuração"""
+        self._listeners.append(callback)
+    
+    def _notify(self, guild_id: int, key: str):
+        """Avisa os observadores sobre uma chave alterada"""
+        for callback in self._listeners:
+            try:
+                callback(guild_id, key)
+            except Exception as e:
+                print(f"❌ Erro ao notificar alteração de '{key}': {e}")
+    
     def _load_action_types(self) -> Dict:
         """Carrega tipos de ações"""
         if os.path.exists(self.action_types_file):
@@ -96,18 +126,22 @@ class ConfigService:
         config = self.get_server_config(guild_id)
         config["action_channel"] = channel_id
         self._save_configs()
+        self._rebuild_action_channels()
+        self._notify(guild_id, "action_channel")
     
     def set_escalation_channel(self, guild_id: int, channel_id: int):
         """Define canal de escalações"""
         config = self.get_server_config(guild_id)
         config["escalation_channel"] = channel_id
         self._save_configs()
+        self._notify(guild_id, "escalation_channel")
     
     def set_report_channel(self, guild_id: int, channel_id: int):
         """Define canal de relatórios"""
         config = self.get_server_config(guild_id)
         config["report_channel"] = channel_id
         self._save_configs()
+        self._notify(guild_id, "report_channel")
     
     def add_escalation_role(self, guild_id: int, role_id: int):
         """Adiciona cargo permitido para escalação"""
@@ -115,6 +149,7 @@ class ConfigService:
         if role_id not in config["escalation_roles"]:
             config["escalation_roles"].append(role_id)
             self._save_configs()
+            self._notify(guild_id, "escalation_roles")
     
     def remove_escalation_role(self, guild_id: int, role_id: int):
         """Remove cargo da lista de escalação"""
@@ -122,6 +157,7 @@ class ConfigService:
         if role_id in config["escalation_roles"]:
             config["escalation_roles"].remove(role_id)
             self._save_configs()
+            self._notify(guild_id, "escalation_roles")
     
     def get_escalation_roles(self, guild_id: int) -> List[int]:
         """Retorna lista de IDs de cargos permitidos para escalação"""
@@ -134,6 +170,7 @@ class ConfigService:
         if role_id not in config["admin_roles"]:
             config["admin_roles"].append(role_id)
             self._save_configs()
+            self._notify(guild_id, "admin_roles")
     
     def remove_admin_role(self, guild_id: int, role_id: int):
         """Remove cargo admin"""
@@ -141,6 +178,7 @@ class ConfigService:
         if role_id in config["admin_roles"]:
             config["admin_roles"].remove(role_id)
             self._save_configs()
+            self._notify(guild_id, "admin_roles")
     
     def get_admin_roles(self, guild_id: int) -> List[int]:
         """Retorna lista de IDs de cargos admin"""
@@ -152,18 +190,21 @@ class ConfigService:
         config = self.get_server_config(guild_id)
         config["inactivity_hours"] = hours
         self._save_configs()
+        self._notify(guild_id, "inactivity_hours")
     
     def set_warning_hours(self, guild_id: int, hours: int):
         """Define horas até aviso"""
         config = self.get_server_config(guild_id)
         config["warning_hours"] = hours
         self._save_configs()
+        self._notify(guild_id, "warning_hours")
     
     def set_auto_close_hours(self, guild_id: int, hours: Optional[int]):
         """Define horas até fechamento automático"""
         config = self.get_server_config(guild_id)
         config["auto_close_hours"] = hours
         self._save_configs()
+        self._notify(guild_id, "auto_close_hours")
     
     def get_action_config(self, action_name: str) -> Dict:
         """Retorna configuração de um tipo de ação"""
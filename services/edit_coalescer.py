@@ -0,0 +1,101 @@
+# services/edit_coalescer.py
+import asyncio
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, Hashable, Optional, Set, Tuple
+
+
+class EditCoalescer:
+    """
+    Junta os pedidos de edição da mensagem de cada ação
+    Ações sujas esperam uma janela curta e recebem uma única edição com o
+    estado mais recente; uma renderização igual à última enviada é descartada
+    
+    render(action_id) -> (payload, assinatura) ou None se a ação sumiu
+    edit(action_id, payload) -> aguardável que faz a edição e retorna False
+    se ela falhou (a assinatura só é guardada depois de uma edição aceita)
+    """
+    
+    def __init__(self, render: Callable[[str], Optional[Tuple[Dict, Hashable]]],
+                 edit: Callable[[str, Dict], Awaitable], window_ms: int = 750,
+                 max_signatures: int = 1024):
+        self.render = render
+        self.edit = edit
+        self.window_ms = window_ms
+        self.max_signatures = max_signatures
+        
+        self._dirty: Dict[str, asyncio.Future] = {}
+        self._editing: Set[str] = set()
+        # Referências fortes às edições em andamento (o loop só guarda fracas)
+        self._tasks: Set[asyncio.Task] = set()
+        # Última assinatura enviada por ação, em LRU: ações finalizadas deixam
+        # de ser editadas e saem sozinhas; sem ela, a próxima edição só não é descartada
+        self._last_signature: "OrderedDict[str, Hashable]" = OrderedDict()
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        
+        self.requested = 0
+        self.edits = 0
+        self.skipped = 0
+    
+    def request(self, action_id: str) -> asyncio.Future:
+        """
+        Marca a mensagem da ação para edição na próxima janela
+        O Future conclui quando a edição (ou o descarte) acontecer
+        """
+        self.requested += 1
+        future = self._dirty.get(action_id)
+        if future is None:
+            future = self._dirty[action_id] = asyncio.get_running_loop().create_future()
+        self._schedule()
+        return future
+    
+    def forget(self, action_id: str):
+        """Esquece a última assinatura (ação apagada ou mensagem recriada)"""
+        self._last_signature.pop(action_id, None)
+    
+    def _schedule(self):
+        if self._flush_handle is None:
+            loop = asyncio.get_running_loop()
+            self._flush_handle = loop.call_later(self.window_ms / 1000, self._start_flush)
+    
+    def _start_flush(self):
+        self._flush_handle = None
+        # Ações com edição em andamento ficam para a próxima janela
+        ready = {action_id: future for action_id, future in self._dirty.items()
+                 if action_id not in self._editing}
+        for action_id in ready:
+            del self._dirty[action_id]
+        if self._dirty:
+            self._schedule()
+        
+        for action_id, future in ready.items():
+            self._editing.add(action_id)
+            task = asyncio.ensure_future(self._apply(action_id, future))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+    
+    async def _apply(self, action_id: str, future: asyncio.Future):
+        try:
+            rendered = self.render(action_id)
+            if rendered is None:
+                self.skipped += 1
+                return
+            
+            payload, signature = rendered
+            if self._last_signature.get(action_id) == signature:
+                self.skipped += 1
+                return
+            
+            if await self.edit(action_id, payload) is False:
+                return
+            
+            self._last_signature[action_id] = signature
+            self._last_signature.move_to_end(action_id)
+            while len(self._last_signature) > self.max_signatures:
+                self._last_signature.popitem(last=False)
+            self.edits += 1
+        except Exception as e:
+            print(f"❌ Erro ao editar mensagem da ação {action_id}: {e}")
+        finally:
+            self._editing.discard(action_id)
+            if not future.done():
+                future.set_result(None)
\ No newline at end of file
@@ -0,0 +1,493 @@
+# services/history_store.py
+import gzip
+import json
+import lzma
+import os
+import sqlite3
+import threading
+from typing import Optional, List, Dict
+from datetime import datetime, date, timedelta
+from .persistence import atomic_write_json
+
+
+def history_cutoff(days: Optional[int]) -> Optional[str]:
+    """Retorna o created_at mínimo (ISO) para uma janela de N dias"""
+    if not days:
+        return None
+    return (datetime.now() - timedelta(days=days)).isoformat()
+
+
+def file_signature(paths: List[str]) -> str:
+    """Resumo (nome, tamanho, mtime) dos arquivos; vazio se nenhum existir"""
+    parts = []
+    for path in paths:
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            continue
+        parts.append(f"{os.path.basename(path)}:{stat.st_size}:{stat.st_mtime_ns}")
+    return "|".join(parts)
+
+
+class JsonHistoryStore:
+    """
+    Histórico em um único arquivo JSON (formato original)
+    Cada upsert relê e regrava o arquivo inteiro
+    """
+    
+    def __init__(self, data_dir: str):
+        self.history_file = os.path.join(data_dir, "actions_history.json")
+    
+    def _read_all(self) -> List[Dict]:
+        if not os.path.exists(self.history_file):
+            return []
+        with open(self.history_file, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    
+    def save(self, action_dict: Dict):
+        """Atualiza ou adiciona uma ação no histórico"""
+        self.save_many([action_dict])
+    
+    def save_many(self, records: List[Dict]):
+        """Atualiza ou adiciona um lote de ações com uma única regravação"""
+        history = self._read_all()
+        positions = {h['action_id']: i for i, h in enumerate(history)}
+        
+        for action_dict in records:
+            existing_idx = positions.get(action_dict['action_id'])
+            if existing_idx is not None:
+                history[existing_idx] = action_dict
+            else:
+                positions[action_dict['action_id']] = len(history)
+                history.append(action_dict)
+        
+        atomic_write_json(self.history_file, history, indent=2, ensure_ascii=False)
+    
+    def get(self, action_id: str) -> Optional[Dict]:
+        """Busca uma ação pelo ID"""
+        return next((h for h in self._read_all() if h['action_id'] == action_id), None)
+    
+    def load(self, days: Optional[int] = None,
+             guild_id: Optional[int] = None) -> List[Dict]:
+        """Carrega registros, opcionalmente filtrados por janela e servidor"""
+        history = self._read_all()
+        
+        if days:
+            cutoff = datetime.now().timestamp() - (days * 24 * 3600)
+            history = [h for h in history
+                      if datetime.fromisoformat(h['created_at']).timestamp() >= cutoff]
+        
+        if guild_id is not None:
+            history = [h for h in history if h['guild_id'] == guild_id]
+        
+        return history
+    
+    def load_between(self, start: str, end: str,
+                     guild_id: Optional[int] = None) -> List[Dict]:
+        """Carrega registros criados em [start, end)"""
+        return [h for h in self._read_all()
+                if start <= h['created_at'] < end
+                and (guild_id is None or h['guild_id'] == guild_id)]
+    
+    def signature(self) -> str:
+        """Identifica o estado do arquivo (muda a cada gravação)"""
+        return file_signature([self.history_file])
+
+
+class SqliteHistoryStore:
+    """
+    Histórico em SQLite com índices por (guild_id, created_at) e action_id
+    Upserts e consultas por janela não dependem do tamanho do histórico
+    
+    Em modo WAL, as leituras usam uma conexão própria por thread e não
+    esperam pela transação da thread de escrita
+    """
+    
+    def __init__(self, data_dir: str):
+        self.db_file = os.path.join(data_dir, "actions_history.db")
+        # Conexão de escrita (thread de persistência); o lock serializa as escritas
+        self._conn = sqlite3.connect(self.db_file, check_same_thread=False)
+        self._db_lock = threading.Lock()
+        self._readers = threading.local()
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS history (
+                action_id TEXT PRIMARY KEY,
+                guild_id INTEGER NOT NULL,
+                created_at TEXT NOT NULL,
+                data TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_history_guild_created
+                ON history (guild_id, created_at);
+            CREATE INDEX IF NOT EXISTS idx_history_created
+                ON history (created_at);
+            CREATE TABLE IF NOT EXISTS meta (
+                key TEXT PRIMARY KEY,
+                value INTEGER NOT NULL
+            );
+        """)
+        self._conn.commit()
+        
+        self._migrate_from_json(data_dir)
+    
+    def _reader(self) -> sqlite3.Connection:
+        """Conexão de leitura da thread atual (criada no primeiro uso)"""
+        conn = getattr(self._readers, 'conn', None)
+        if conn is None:
+            conn = self._readers.conn = sqlite3.connect(self.db_file)
+        return conn
+    
+    def _migrate_from_json(self, data_dir: str):
+        """Importa o actions_history.json na primeira execução"""
+        count = self._conn.execute("SELECT COUNT(*) FROM history").fetchone()[0]
+        if count:
+            return
+        
+        legacy = JsonHistoryStore(data_dir)
+        records = legacy.load()
+        if not records:
+            return
+        
+        self._upsert_many(records)
+        print(f"✅ {len(records)} registros do histórico migrados para SQLite")
+    
+    def _upsert_many(self, records: List[Dict]):
+        with self._db_lock:
+            self._upsert_many_locked(records)
+    
+    def _upsert_many_locked(self, records: List[Dict]):
+        self._conn.executemany(
+            """
+            INSERT INTO history (action_id, guild_id, created_at, data)
+            VALUES (?, ?, ?, ?)
+            ON CONFLICT(action_id) DO UPDATE SET
+                guild_id = excluded.guild_id,
+                created_at = excluded.created_at,
+                data = excluded.data
+            """,
+            [(r['action_id'], r['guild_id'], r['created_at'],
+              json.dumps(r, ensure_ascii=False, separators=(',', ':')))
+             for r in records]
+        )
+        # Contador de gravações: no WAL, o arquivo do banco só muda no checkpoint
+        self._conn.execute(
+            """
+            INSERT INTO meta (key, value) VALUES ('version', 1)
+            ON CONFLICT(key) DO UPDATE SET value = value + 1
+            """
+        )
+        self._conn.commit()
+    
+    def save(self, action_dict: Dict):
+        """Atualiza ou adiciona uma ação no histórico"""
+        self._upsert_many([action_dict])
+    
+    def save_many(self, records: List[Dict]):
+        """Atualiza ou adiciona um lote de ações em uma transação"""
+        self._upsert_many(records)
+    
+    def get(self, action_id: str) -> Optional[Dict]:
+        """Busca uma ação pelo ID (chave primária)"""
+        row = self._reader().execute(
+            "SELECT data FROM history WHERE action_id = ?", (action_id,)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+    
+    def load(self, days: Optional[int] = None,
+             guild_id: Optional[int] = None) -> List[Dict]:
+        """Carrega registros, opcionalmente filtrados por janela e servidor"""
+        query = "SELECT data FROM history"
+        conditions = []
+        params = []
+        
+        if guild_id is not None:
+            conditions.append("guild_id = ?")
+            params.append(guild_id)
+        
+        cutoff = history_cutoff(days)
+        if cutoff:
+            conditions.append("created_at >= ?")
+            params.append(cutoff)
+        
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY created_at"
+        
+        rows = self._reader().execute(query, params).fetchall()
+        return [json.loads(row[0]) for row in rows]
+    
+    def load_between(self, start: str, end: str,
+                     guild_id: Optional[int] = None) -> List[Dict]:
+        """Carrega registros criados em [start, end) pelo índice de created_at"""
+        query = "SELECT data FROM history WHERE created_at >= ? AND created_at < ?"
+        params = [start, end]
+        if guild_id is not None:
+            query += " AND guild_id = ?"
+            params.append(guild_id)
+        
+        rows = self._reader().execute(query, params).fetchall()
+        return [json.loads(row[0]) for row in rows]
+    
+    def signature(self) -> str:
+        """Identifica o estado do banco (muda a cada commit)"""
+        row = self._reader().execute("SELECT value FROM meta WHERE key = 'version'").fetchone()
+        return f"{os.path.basename(self.db_file)}:{row[0] if row else 0}"
+
+
+class SegmentedHistoryStore:
+    """
+    Histórico particionado em um arquivo por dia (history/AAAA-MM-DD.json)
+    Meses encerrados são congelados em um único arquivo comprimido
+    (history/AAAA-MM.json.gz ou .json.xz), lido só quando a janela o alcança
+    """
+    
+    COMPRESSION_SUFFIX = {None: ".json", "gzip": ".json.gz", "lzma": ".json.xz"}
+    
+    def __init__(self, data_dir: str, compression: Optional[str] = "gzip",
+                 freeze_after_days: int = 7):
+        if compression not in self.COMPRESSION_SUFFIX:
+            raise ValueError(f"Compressão desconhecida: {compression}")
+        
+        self.segments_dir = os.path.join(data_dir, "history")
+        self.compression = compression
+        self.freeze_after_days = freeze_after_days
+        self._last_freeze_check: Optional[date] = None
+        # Serializa as escritas (gravações e congelamento); as leituras não o
+        # tomam, pois cada arquivo é trocado por rename atômico
+        self._segments_lock = threading.RLock()
+        
+        migrate = not os.path.isdir(self.segments_dir)
+        os.makedirs(self.segments_dir, exist_ok=True)
+        if migrate:
+            self._migrate_from_json(data_dir)
+        
+        self.freeze_closed_months()
+    
+    def _migrate_from_json(self, data_dir: str):
+        """Distribui o actions_history.json nos segmentos diários"""
+        records = JsonHistoryStore(data_dir).load()
+        if not records:
+            return
+        
+        by_day: Dict[str, Dict[str, Dict]] = {}
+        for record in records:
+            by_day.setdefault(record['created_at'][:10], {})[record['action_id']] = record
+        
+        for day, segment in by_day.items():
+            self._write_segment(self._day_path(day), segment)
+        print(f"✅ {len(records)} registros do histórico divididos em {len(by_day)} segmentos")
+    
+    def _day_path(self, day: str) -> str:
+        return os.path.join(self.segments_dir, f"{day}.json")
+    
+    def _frozen_path(self, month: str) -> Optional[str]:
+        """Retorna o arquivo congelado do mês, se existir (qualquer compressão)"""
+        for suffix in self.COMPRESSION_SUFFIX.values():
+            path = os.path.join(self.segments_dir, f"{month}{suffix}")
+            if os.path.exists(path):
+                return path
+        return None
+    
+    def _read_paths(self, list_paths) -> Dict[str, Dict]:
+        """
+        Lê os segmentos listados por list_paths() sem o lock de escrita
+        Um congelamento no meio da leitura remove os arquivos diários: a
+        leitura recomeça, e a última tentativa espera o congelamento terminar.
+        Um registro lido do arquivo congelado e do diário aparece uma vez só
+        """
+        for attempt in range(3):
+            try:
+                if attempt == 2:
+                    with self._segments_lock:
+                        return self._read_all_paths(list_paths())
+                return self._read_all_paths(list_paths())
+            except FileNotFoundError:
+                continue
+        return {}
+    
+    def _read_all_paths(self, paths: List[str]) -> Dict[str, Dict]:
+        records = {}
+        for path in paths:
+            with self._open_like(path, path, 'r') as f:
+                records.update(json.load(f))
+        return records
+    
+    def _read_segment(self, path: str) -> Dict[str, Dict]:
+        if not os.path.exists(path):
+            return {}
+        with self._open_like(path, path, 'r') as f:
+            return json.load(f)
+    
+    def _write_segment(self, path: str, segment: Dict[str, Dict]):
+        atomic_write_json(path, segment, opener=lambda p: self._open_like(path, p, 'w'),
+                          ensure_ascii=False, separators=(',', ':'))
+    
+    def _open_like(self, target: str, path: str, mode: str):
+        """Abre path com a mesma compressão do arquivo final"""
+        if target.endswith(".gz"):
+            return gzip.open(path, mode + 't', encoding='utf-8')
+        if target.endswith(".xz"):
+            return lzma.open(path, mode + 't', encoding='utf-8')
+        return open(path, mode, encoding='utf-8')
+    
+    def save(self, action_dict: Dict):
+        """Atualiza ou adiciona uma ação no segmento do dia de criação"""
+        self.save_many([action_dict])
+    
+    def save_many(self, records: List[Dict]):
+        """Atualiza um lote de ações, regravando cada segmento uma vez"""
+        with self._segments_lock:
+            by_path: Dict[str, List[Dict]] = {}
+            for action_dict in records:
+                created_at = action_dict['created_at']
+                # Ação de um mês já congelado (ex.: criada dia 31, finalizada dia 1)
+                frozen = self._frozen_path(created_at[:7])
+                path = frozen or self._day_path(created_at[:10])
+                by_path.setdefault(path, []).append(action_dict)
+            
+            for path, path_records in by_path.items():
+                segment = self._read_segment(path)
+                for action_dict in path_records:
+                    segment[action_dict['action_id']] = action_dict
+                self._write_segment(path, segment)
+            
+            if self._last_freeze_check != date.today():
+                self.freeze_closed_months()
+    
+    def get(self, action_id: str) -> Optional[Dict]:
+        """
+        Busca uma ação pelo ID
+        O ID termina no timestamp de criação, então só o dia dela (e os
+        vizinhos, por causa da virada do dia) precisa ser lido
+        """
+        try:
+            created = datetime.fromtimestamp(int(action_id.rsplit('_', 1)[1]) / 1000).date()
+        except (IndexError, ValueError):
+            return None
+        
+        for offset in (0, -1, 1):
+            day = created + timedelta(days=offset)
+            record = self._read_paths(lambda: self._day_paths(day)).get(action_id)
+            if record:
+                return record
+        return None
+    
+    def _day_paths(self, day: date) -> List[str]:
+        """Arquivos que podem guardar ações criadas no dia (diário e mês congelado)"""
+        paths = [self._day_path(day.isoformat()), self._frozen_path(day.strftime("%Y-%m"))]
+        return [path for path in paths if path and os.path.exists(path)]
+    
+    def load(self, days: Optional[int] = None,
+             guild_id: Optional[int] = None) -> List[Dict]:
+        """Carrega só os segmentos que cobrem a janela pedida"""
+        cutoff = history_cutoff(days)
+        
+        if cutoff:
+            list_paths = lambda: self._window_paths(datetime.fromisoformat(cutoff).date())
+        else:
+            list_paths = self._all_paths
+        records = sorted(self._read_paths(list_paths).values(), key=lambda r: r['created_at'])
+        
+        if cutoff:
+            records = [r for r in records if r['created_at'] >= cutoff]
+        
+        if guild_id is not None:
+            records = [r for r in records if r['guild_id'] == guild_id]
+        
+        return records
+    
+    def load_between(self, start: str, end: str,
+                     guild_id: Optional[int] = None) -> List[Dict]:
+        """Carrega registros criados em [start, end), lendo só os segmentos da janela"""
+        records = self._read_paths(lambda: self._window_paths(
+            datetime.fromisoformat(start).date(), datetime.fromisoformat(end).date()))
+        
+        return [r for r in records.values()
+                if start <= r['created_at'] < end
+                and (guild_id is None or r['guild_id'] == guild_id)]
+    
+    def signature(self) -> str:
+        """Identifica o estado dos segmentos (muda a cada gravação ou congelamento)"""
+        return file_signature(self._all_paths())
+    
+    def _all_paths(self) -> List[str]:
+        """Todos os segmentos (congelados e diários), em ordem de nome"""
+        return [os.path.join(self.segments_dir, name)
+                for name in sorted(os.listdir(self.segments_dir))
+                if not name.endswith(".tmp")]
+    
+    def _window_paths(self, start: date, end: Optional[date] = None) -> List[str]:
+        """Arquivos (congelados e diários) entre start e end (ou hoje), em ordem"""
+        paths = []
+        seen_months = set()
+        day = start
+        last = end or date.today()
+        while day <= last:
+            month = day.strftime("%Y-%m")
+            if month not in seen_months:
+                seen_months.add(month)
+                frozen = self._frozen_path(month)
+                if frozen:
+                    paths.append(frozen)
+            
+            path = self._day_path(day.isoformat())
+            if os.path.exists(path):
+                paths.append(path)
+            day += timedelta(days=1)
+        return paths
+    
+    def freeze_closed_months(self):
+        """Junta os segmentos diários de meses encerrados em um arquivo comprimido"""
+        with self._segments_lock:
+            self._freeze_closed_months()
+    
+    def _freeze_closed_months(self):
+        today = date.today()
+        self._last_freeze_check = today
+        
+        # Um mês só congela alguns dias após terminar, quando as ações
+        # criadas nele já tiveram tempo de receber resultado
+        limit = (today - timedelta(days=self.freeze_after_days)).replace(day=1)
+        limit_month = limit.strftime("%Y-%m")
+        
+        by_month: Dict[str, List[str]] = {}
+        for name in os.listdir(self.segments_dir):
+            # Apenas segmentos diários (AAAA-MM-DD.json)
+            if len(name) != len("AAAA-MM-DD.json") or not name.endswith(".json"):
+                continue
+            month = name[:7]
+            if month < limit_month:
+                by_month.setdefault(month, []).append(name)
+        
+        for month, names in sorted(by_month.items()):
+            try:
+                frozen = self._frozen_path(month)
+                merged = self._read_segment(frozen) if frozen else {}
+                for name in sorted(names):
+                    merged.update(self._read_segment(os.path.join(self.segments_dir, name)))
+                
+                target = os.path.join(self.segments_dir,
+                                      f"{month}{self.COMPRESSION_SUFFIX[self.compression]}")
+                self._write_segment(target, merged)
+                if frozen and frozen != target:
+                    os.remove(frozen)
+                for name in names:
+                    os.remove(os.path.join(self.segments_dir, name))
+                print(f"🧊 Histórico de {month} congelado ({len(merged)} ações)")
+            except Exception as e:
+                print(f"❌ Erro ao congelar histórico de {month}: {e}")
+
+
+def open_history_store(backend: str, data_dir: str, compression: Optional[str] = "gzip",
+                       freeze_after_days: int = 7):
+    """
+    Cria o backend de histórico configurado
+    compression e freeze_after_days só valem para o backend "segments"
+    """
+    if backend == "json":
+        return JsonHistoryStore(data_dir)
+    if backend == "sqlite":
+        return SqliteHistoryStore(data_dir)
+    if backend == "segments":
+        return SegmentedHistoryStore(data_dir, compression, freeze_after_days)
+    raise ValueError(f"Backend de histórico desconhecido: {backend}")
\ No newline at end of file
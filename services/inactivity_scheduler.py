@@ -0,0 +1,145 @@
+# services/inactivity_scheduler.py
+import asyncio
+import heapq
+import time
+from datetime import datetime
+from typing import List, Tuple, Set, Optional
+from models.action import ActionData
+
+
+class InactivityScheduler:
+    """
+    Agenda de prazos de inatividade (min-heap de (prazo, action_id, tipo))
+    Em vez de varrer todas as ações periodicamente, dorme até o próximo prazo
+    
+    Entradas obsoletas (ação finalizada, apagada, já avisada ou com horas
+    alteradas na configuração) não são removidas do heap: são descartadas
+    quando chegam ao topo
+    """
+    
+    WARNING = "warning"
+    CLOSE = "close"
+    
+    # Espera antes de tentar de novo um prazo que não pôde ser processado
+    RETRY_BACKOFF = 300
+    
+    def __init__(self, action_service, config_service):
+        self.action_service = action_service
+        self.config_service = config_service
+        
+        # (prazo em timestamp, action_id, tipo, horas usadas no cálculo)
+        self._heap: List[Tuple[float, str, str, float]] = []
+        self._wakeup: Optional[asyncio.Event] = None
+        
+        action_service.add_listener(self._on_action_event)
+        config_service.add_listener(self._on_config_change)
+        
+        self.rebuild()
+    
+    def _hours(self, guild_id: int, kind: str) -> float:
+        """Horas configuradas no servidor para o tipo de prazo"""
+        config = self.config_service.get_server_config(guild_id)
+        if kind == self.WARNING:
+            return config.get('warning_hours', 20)
+        return config.get('inactivity_hours', 24)
+    
+    def rebuild(self):
+        """Reconstrói o heap a partir das ações ativas (boot)"""
+        self._heap = []
+        for action in self.action_service.get_actions_needing_inactivity_close(hours=0):
+            self._schedule(action)
+        heapq.heapify(self._heap)
+        self._wake()
+    
+    def _schedule(self, action: ActionData):
+        """Empilha os prazos pendentes de uma ação"""
+        created = datetime.fromisoformat(action.created_at).timestamp()
+        
+        kinds = [self.CLOSE]
+        if not action.inactivity_warned_at:
+            kinds.append(self.WARNING)
+        
+        for kind in kinds:
+            hours = self._hours(action.guild_id, kind)
+            heapq.heappush(self._heap, (created + hours * 3600, action.action_id, kind, hours))
+    
+    def schedule_action(self, action: ActionData):
+        """Agenda uma ação nova e acorda o loop se o prazo for o mais próximo"""
+        self._schedule(action)
+        self._wake()
+    
+    def reschedule_guild(self, guild_id: int):
+        """Recalcula os prazos de um servidor (horas alteradas na configuração)"""
+        for action in self.action_service.get_actions_needing_inactivity_close(
+                hours=0, guild_id=guild_id):
+            self._schedule(action)
+        self._wake()
+    
+    def retry(self, action: ActionData, kind: str, hours: float):
+        """
+        Devolve ao heap um prazo vencido que não pôde ser processado (servidor
+        indisponível, falha no handler); volta a vencer após RETRY_BACKOFF
+        """
+        heapq.heappush(self._heap, (time.time() + self.RETRY_BACKOFF,
+                                    action.action_id, kind, hours))
+        self._wake()
+    
+    def _on_action_event(self, event: str, action: ActionData):
+        if event in ("created", "reopened"):
+            self.schedule_action(action)
+    
+    def _on_config_change(self, guild_id: int, key: str):
+        if key in ("warning_hours", "inactivity_hours"):
+            self.reschedule_guild(guild_id)
+    
+    def _wake(self):
+        if self._wakeup is not None:
+            self._wakeup.set()
+    
+    def _is_valid(self, action_id: str, kind: str, hours: float) -> bool:
+        """Confere se a entrada do heap ainda vale"""
+        action = self.action_service.active_actions.get(action_id)
+        if not action or action.has_result():
+            return False
+        if kind == self.WARNING and action.inactivity_warned_at:
+            return False
+        return self._hours(action.guild_id, kind) == hours
+    
+    def _pop_due(self, now: float) -> List[Tuple[ActionData, str, float]]:
+        """Retira do heap todas as entradas vencidas e válidas"""
+        due = []
+        seen: Set[Tuple[str, str]] = set()
+        while self._heap and self._heap[0][0] <= now:
+            _, action_id, kind, hours = heapq.heappop(self._heap)
+            if (action_id, kind) in seen or not self._is_valid(action_id, kind, hours):
+                continue
+            seen.add((action_id, kind))
+            due.append((self.action_service.active_actions[action_id], kind, hours))
+        return due
+    
+    @property
+    def next_deadline(self) -> Optional[float]:
+        """Timestamp da próxima entrada do heap (pode ser obsoleta)"""
+        return self._heap[0][0] if self._heap else None
+    
+    async def wait_due(self) -> List[Tuple[ActionData, str, float]]:
+        """
+        Dorme até o próximo prazo (ou até um prazo mais próximo ser agendado)
+        e retorna as entradas vencidas como (ação, tipo, horas)
+        """
+        if self._wakeup is None:
+            self._wakeup = asyncio.Event()
+        
+        while True:
+            self._wakeup.clear()
+            due = self._pop_due(time.time())
+            if due:
+                return due
+            
+            timeout = None
+            if self._heap:
+                timeout = max(0, self._heap[0][0] - time.time())
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
\ No newline at end of file
@@ -0,0 +1,44 @@
+# services/interaction_metrics.py
+from collections import deque
+from typing import Deque, Dict
+
+
+class InteractionMetrics:
+    """
+    Latência até o reconhecimento (defer) de cada callback de interação
+    Guarda as últimas amostras por callback e conta as que passaram do limite
+    """
+    
+    def __init__(self, window: int = 500, slow_seconds: float = 2.5):
+        self.window = window
+        self.slow_seconds = slow_seconds
+        
+        self._samples: Dict[str, Deque[float]] = {}
+        self.counts: Dict[str, int] = {}
+        self.slow: Dict[str, int] = {}
+    
+    def record(self, name: str, seconds: float):
+        """Registra a latência de reconhecimento de um callback"""
+        samples = self._samples.get(name)
+        if samples is None:
+            samples = self._samples[name] = deque(maxlen=self.window)
+        samples.append(seconds)
+        self.counts[name] = self.counts.get(name, 0) + 1
+        
+        if seconds >= self.slow_seconds:
+            self.slow[name] = self.slow.get(name, 0) + 1
+            print(f"⚠️ Interação '{name}' reconhecida em {seconds:.2f}s")
+    
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """Média, p95 e máximo das amostras recentes de cada callback"""
+        result = {}
+        for name, samples in self._samples.items():
+            ordered = sorted(samples)
+            result[name] = {
+                'count': self.counts[name],
+                'avg': sum(ordered) / len(ordered),
+                'p95': ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+                'max': ordered[-1],
+                'slow': self.slow.get(name, 0)
+            }
+        return result
\ No newline at end of file
@@ -0,0 +1,80 @@
+# services/message_updater.py
+from typing import Dict, Optional
+from .outbound_scheduler import OutboundScheduler
+
+
+def _is_not_found(error: Exception) -> bool:
+    return getattr(error, 'status', None) == 404
+
+
+class ActionMessageUpdater:
+    """
+    Ponto único de edição das mensagens de ação
+    Edita por mensagem parcial a partir do channel_id/message_id guardados,
+    sem o GET do fetch_message; só quando a mensagem sumiu ela é recriada
+    """
+    
+    def __init__(self, bot, action_service, scheduler: Optional[OutboundScheduler] = None):
+        self.bot = bot
+        self.action_service = action_service
+        self.scheduler = scheduler or OutboundScheduler()
+        
+        self.edits = 0
+        self.recoveries = 0
+    
+    def _partial_message(self, channel_id: int, message_id: int):
+        channel = self.bot.get_partial_messageable(channel_id)
+        return channel.get_partial_message(message_id)
+    
+    async def edit(self, action_id: str, payload: Dict) -> bool:
+        """Edita a mensagem da ação com o payload (embed/view) já renderizado"""
+        action = self.action_service.get_action(action_id)
+        if not action or not action.channel_id or not action.message_id:
+            return False
+        
+        try:
+            message = self._partial_message(action.channel_id, action.message_id)
+            await self.scheduler.run(OutboundScheduler.LIVE_EDIT, action.channel_id,
+                                     lambda: message.edit(**payload))
+            self.edits += 1
+            return True
+        except Exception as e:
+            if not _is_not_found(e):
+                raise
+        
+        return await self._recover(action_id, payload)
+    
+    async def _recover(self, action_id: str, payload: Dict) -> bool:
+        """Recria a mensagem de uma ação ativa que foi apagada do canal"""
+        # Ação removida ou finalizada e já fora da memória: nada a recriar
+        action = self.action_service.active_actions.get(action_id)
+        if not action:
+            return False
+        
+        channel = self.bot.get_channel(action.channel_id)
+        if channel is None:
+            print(f"❌ Canal da ação {action_id} não encontrado")
+            return False
+        
+        message = await self.scheduler.run(OutboundScheduler.LIVE_EDIT, action.channel_id,
+                                           lambda: channel.send(**payload))
+        action.message_id = message.id
+        self.action_service.save_action(action)
+        self.recoveries += 1
+        print(f"♻️ Mensagem da ação {action_id} recriada")
+        return True
+    
+    async def delete(self, action_id: str) -> bool:
+        """Apaga a mensagem da ação (ignora se ela já não existir)"""
+        action = self.action_service.get_action(action_id)
+        if not action or not action.channel_id or not action.message_id:
+            return False
+        
+        try:
+            message = self._partial_message(action.channel_id, action.message_id)
+            await self.scheduler.run(OutboundScheduler.LIVE_EDIT, action.channel_id, message.delete)
+            return True
+        except Exception as e:
+            if _is_not_found(e):
+                return False
+            raise
\ No newline at end of file
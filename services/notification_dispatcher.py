@@ -0,0 +1,115 @@
+# services/notification_dispatcher.py
+import asyncio
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Hashable, List, Optional
+from .outbound_scheduler import OutboundScheduler
+from .route_limiter import RouteLimiter, get_retry_after
+
+
+@dataclass
+class Notification:
+    """DM pendente"""
+    action_id: str
+    kind: str
+    route: Hashable  # ID do usuário destinatário
+    send: Callable[[], Awaitable]
+
+
+class NotificationDispatcher:
+    """
+    Fila de DMs (avisos e fechamentos por inatividade, resultados para
+    participantes) atendida por N workers, sem travar quem enfileira
+    Cada (action_id, tipo, destinatário) é notificado uma única vez; 429 volta
+    para a fila da rota com backoff
+    """
+    
+    WARNING = "inactivity_warning"
+    INACTIVITY = "inactivity_closed"
+    RESULT = "result"
+    
+    def __init__(self, workers: int = 4, max_retries: int = 3,
+                 base_backoff: float = 1.0, dedupe_size: int = 10000,
+                 route_limiter: Optional[RouteLimiter] = None,
+                 scheduler: Optional[OutboundScheduler] = None):
+        self.workers = workers
+        self.max_retries = max_retries
+        self.base_backoff = base_backoff
+        self.dedupe_size = dedupe_size
+        self.route_limiter = route_limiter or RouteLimiter()
+        self.scheduler = scheduler or OutboundScheduler()
+        
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        # Chaves já enfileiradas, em ordem de chegada (as mais antigas saem primeiro)
+        self._seen: "OrderedDict[tuple, None]" = OrderedDict()
+        
+        self.sent = 0
+        self.failed = 0
+        self.deduplicated = 0
+    
+    def _start(self):
+        """Cria a fila e os workers no event loop atual"""
+        self._queue = asyncio.Queue()
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+    
+    def notify(self, action_id: str, kind: str, route: Hashable,
+               send: Callable[[], Awaitable]) -> bool:
+        """Enfileira uma DM; retorna False se ela já foi enfileirada antes"""
+        key = (action_id, kind, route)
+        if key in self._seen:
+            self.deduplicated += 1
+            return False
+        
+        self._seen[key] = None
+        while len(self._seen) > self.dedupe_size:
+            self._seen.popitem(last=False)
+        
+        if self._queue is None:
+            self._start()
+        self._queue.put_nowait(Notification(action_id, kind, route, send))
+        return True
+    
+    async def _worker(self):
+        while True:
+            notification = await self._queue.get()
+            try:
+                await self._deliver(notification)
+            finally:
+                self._queue.task_done()
+    
+    async def _deliver(self, notification: Notification):
+        for attempt in range(self.max_retries + 1):
+            await self.route_limiter.acquire(notification.route)
+            try:
+                await self.scheduler.run(OutboundScheduler.NOTIFICATION,
+                                         notification.route, notification.send)
+                self.sent += 1
+                return
+            except Exception as e:
+                retry_after = get_retry_after(e)
+                if retry_after is None or attempt == self.max_retries:
+                    self.failed += 1
+                    print(f"❌ Erro ao enviar notificação '{notification.kind}' "
+                          f"da ação {notification.action_id}: {e}")
+                    return
+                
+                # 429: espera o maior entre o pedido pelo Discord e o backoff
+                self.route_limiter.block(notification.route,
+                                         max(retry_after, self.base_backoff * 2 ** attempt))
+    
+    @property
+    def pending_count(self) -> int:
+        return self._queue.qsize() if self._queue else 0
+    
+    async def close(self, timeout: float = 10):
+        """Aguarda a fila esvaziar (até timeout) e encerra os workers"""
+        if self._queue is None:
+            return
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout)
+        except asyncio.TimeoutError:
+            print(f"⚠️ {self.pending_count} notificações descartadas no encerramento")
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
\ No newline at end of file
@@ -0,0 +1,136 @@
+# services/outbound_scheduler.py
+import asyncio
+import heapq
+import itertools
+import time
+from contextlib import asynccontextmanager
+from typing import Awaitable, Callable, Dict, Hashable, List, Optional, Tuple
+
+
+class OutboundScheduler:
+    """
+    Fila de prioridade para as escritas na API do Discord
+    Respostas a interações passam na frente de edições das ações, que passam
+    na frente de DMs e relatórios; edições, DMs e relatórios têm teto de vagas
+    por classe e cada rota (canal/usuário) um teto de envios simultâneos
+    
+    Reconhecimentos de interação não esperam pelo teto global: uma edição
+    presa no rate limit de um canal nunca atrasa o prazo de 3s do Discord
+    """
+    
+    INTERACTION = 0
+    LIVE_EDIT = 1
+    NOTIFICATION = 2
+    REPORT = 3
+    
+    NAMES = {INTERACTION: "interaction", LIVE_EDIT: "live_edit",
+             NOTIFICATION: "notification", REPORT: "report"}
+    
+    def __init__(self, max_concurrency: int = 10, per_route: int = 2,
+                 class_limits: Optional[Dict[int, int]] = None):
+        self.max_concurrency = max_concurrency
+        self.per_route = per_route
+        # Teto de vagas por classe; classes fora do dicionário usam todas
+        self.class_limits = class_limits if class_limits is not None else {
+            self.LIVE_EDIT: max(1, max_concurrency - 2),
+            self.NOTIFICATION: 4,
+            self.REPORT: 3
+        }
+        
+        self._active = 0
+        self._active_by_class: Dict[int, int] = {}
+        self._active_by_route: Dict[Hashable, int] = {}
+        # (prioridade, ordem de chegada, rota, future)
+        self._waiting: List[Tuple[int, int, Hashable, asyncio.Future]] = []
+        self._order = itertools.count()
+        
+        self.granted: Dict[int, int] = {}
+        self.wait_seconds: Dict[int, float] = {}
+    
+    def _can_run(self, priority: int, route: Hashable) -> bool:
+        if priority != self.INTERACTION and self._active >= self.max_concurrency:
+            return False
+        limit = self.class_limits.get(priority)
+        if limit is not None and self._active_by_class.get(priority, 0) >= limit:
+            return False
+        if route is not None and self._active_by_route.get(route, 0) >= self.per_route:
+            return False
+        return True
+    
+    def _take(self, priority: int, route: Hashable):
+        self._active += 1
+        self._active_by_class[priority] = self._active_by_class.get(priority, 0) + 1
+        if route is not None:
+            self._active_by_route[route] = self._active_by_route.get(route, 0) + 1
+    
+    def _wake(self):
+        """Libera os pedidos em espera por ordem de prioridade, respeitando os tetos"""
+        still_waiting = []
+        for entry in sorted(self._waiting):
+            priority, _, route, future = entry
+            if future.done():
+                continue
+            if self._can_run(priority, route):
+                self._take(priority, route)
+                future.set_result(None)
+            else:
+                still_waiting.append(entry)
+        self._waiting = still_waiting
+        heapq.heapify(self._waiting)
+    
+    async def acquire(self, priority: int, route: Hashable = None):
+        """Aguarda uma vaga para um envio da classe na rota"""
+        started = time.monotonic()
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiting, (priority, next(self._order), route, future))
+        self._wake()
+        
+        try:
+            await future
+        except asyncio.CancelledError:
+            # Cancelado depois de receber a vaga: devolve
+            if future.done() and not future.cancelled():
+                self.release(priority, route)
+            raise
+        
+        self.granted[priority] = self.granted.get(priority, 0) + 1
+        self.wait_seconds[priority] = self.wait_seconds.get(priority, 0) + \
+            time.monotonic() - started
+    
+    def release(self, priority: int, route: Hashable = None):
+        """Devolve a vaga e acorda os próximos da fila"""
+        self._active -= 1
+        self._active_by_class[priority] -= 1
+        if route is not None:
+            self._active_by_route[route] -= 1
+            if not self._active_by_route[route]:
+                del self._active_by_route[route]
+        self._wake()
+    
+    @asynccontextmanager
+    async def slot(self, priority: int, route: Hashable = None):
+        """Mantém uma vaga durante o bloco"""
+        await self.acquire(priority, route)
+        try:
+            yield
+        finally:
+            self.release(priority, route)
+    
+    async def run(self, priority: int, route: Hashable, send: Callable[[], Awaitable]):
+        """Executa o envio quando houver vaga e retorna o seu resultado"""
+        async with self.slot(priority, route):
+            return await send()
+    
+    @property
+    def pending_count(self) -> int:
+        return sum(1 for entry in self._waiting if not entry[3].done())
+    
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """Envios liberados e espera média por classe"""
+        return {
+            self.NAMES.get(priority, str(priority)): {
+                'granted': count,
+                'avg_wait': self.wait_seconds.get(priority, 0) / count
+            }
+            for priority, count in self.granted.items()
+        }
\ No newline at end of file
@@ -0,0 +1,70 @@
+# services/persistence.py
+import asyncio
+import json
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Set
+
+
+def atomic_write_json(path: str, data, opener: Callable = None, **dump_kwargs):
+    """
+    Grava JSON em um arquivo temporário e troca com os.replace
+    Uma queda no meio da escrita nunca deixa o arquivo final pela metade
+    """
+    tmp_path = f"{path}.tmp"
+    if opener is None:
+        opener = lambda p: open(p, 'w', encoding='utf-8')
+    
+    with opener(tmp_path) as f:
+        json.dump(data, f, **dump_kwargs)
+    
+    # Garante que o conteúdo chegou ao disco antes da troca
+    fd = os.open(tmp_path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+    
+    os.replace(tmp_path, path)
+
+
+class PersistenceWriter:
+    """
+    Executa escritas em disco em uma thread dedicada, fora do event loop
+    Uma única thread garante que as escritas acontecem na ordem de envio
+    """
+    
+    def __init__(self):
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="persistence")
+        self._pending: Set[Future] = set()
+        self._pending_lock = threading.Lock()
+    
+    def submit(self, fn: Callable, *args) -> Future:
+        """Agenda uma escrita; o Future conclui quando ela estiver no disco"""
+        future = self._executor.submit(fn, *args)
+        with self._pending_lock:
+            self._pending.add(future)
+        future.add_done_callback(self._discard)
+        return future
+    
+    def _discard(self, future: Future):
+        with self._pending_lock:
+            self._pending.discard(future)
+    
+    @property
+    def pending_count(self) -> int:
+        return len(self._pending)
+    
+    async def drain(self):
+        """Aguarda todas as escritas pendentes"""
+        with self._pending_lock:
+            pending = list(self._pending)
+        if pending:
+            await asyncio.gather(*(asyncio.wrap_future(f) for f in pending),
+                                 return_exceptions=True)
+    
+    async def close(self):
+        """Aguarda as escritas pendentes e encerra a thread"""
+        await self.drain()
+        self._executor.shutdown(wait=True)
\ No newline at end of file
@@ -0,0 +1,70 @@
+# services/rate_limiter.py
+import time
+from typing import Dict, Optional, Tuple
+
+
+class InteractionRateLimiter:
+    """
+    Limite de cliques/comandos por (usuário, servidor, tipo) com token bucket
+    Um único limitador é compartilhado por todas as views e slash commands;
+    cada tipo de ação tem sua rajada e recarga, e buckets ociosos expiram
+    """
+    
+    # Rajada de 1 e recarga a cada 2s equivale ao antigo cooldown das views
+    DEFAULT_LIMIT = (1, 0.5)
+    
+    def __init__(self, limits: Optional[Dict[str, Tuple[float, float]]] = None,
+                 default_limit: Tuple[float, float] = DEFAULT_LIMIT,
+                 idle_seconds: float = 300, sweep_every: int = 1000):
+        # tipo -> (rajada, tokens por segundo)
+        self.limits = dict(limits or {})
+        self.default_limit = default_limit
+        self.idle_seconds = idle_seconds
+        self.sweep_every = sweep_every
+        
+        # (user_id, guild_id, tipo) -> (tokens, último acesso)
+        self._buckets: Dict[Tuple[int, int, str], Tuple[float, float]] = {}
+        self._calls = 0
+        
+        self.allowed = 0
+        self.rejected = 0
+        self.rejected_by_kind: Dict[str, int] = {}
+    
+    def set_limit(self, kind: str, burst: float, refill_per_second: float):
+        """Define a rajada e a recarga de um tipo de ação"""
+        self.limits[kind] = (burst, refill_per_second)
+    
+    def allow(self, user_id: int, guild_id: int, kind: str) -> bool:
+        """Consome um token do bucket; retorna False se o usuário deve aguardar"""
+        now = time.monotonic()
+        burst, refill = self.limits.get(kind, self.default_limit)
+        key = (user_id, guild_id or 0, kind)
+        
+        tokens, last = self._buckets.get(key, (burst, now))
+        tokens = min(burst, tokens + (now - last) * refill)
+        
+        self._calls += 1
+        if self._calls >= self.sweep_every:
+            self._calls = 0
+            self.forget_idle(now)
+        
+        if tokens < 1:
+            self._buckets[key] = (tokens, now)
+            self.rejected += 1
+            self.rejected_by_kind[kind] = self.rejected_by_kind.get(kind, 0) + 1
+            return False
+        
+        self._buckets[key] = (tokens - 1, now)
+        self.allowed += 1
+        return True
+    
+    def forget_idle(self, now: Optional[float] = None):
+        """Descarta buckets sem uso há mais de idle_seconds"""
+        now = now if now is not None else time.monotonic()
+        for key in [k for k, (_, last) in self._buckets.items()
+                    if now - last >= self.idle_seconds]:
+            del self._buckets[key]
+    
+    @property
+    def bucket_count(self) -> int:
+        return len(self._buckets)
\ No newline at end of file
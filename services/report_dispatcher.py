@@ -0,0 +1,75 @@
+# services/report_dispatcher.py
+import asyncio
+import random
+import time
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, Hashable, List, Optional
+from .outbound_scheduler import OutboundScheduler
+from .route_limiter import RouteLimiter, get_retry_after
+
+
+@dataclass
+class ReportJob:
+    """Envio do relatório de um servidor"""
+    guild_id: int
+    route: Hashable  # ID do canal de relatórios
+    send: Callable[[], Awaitable]
+
+
+class ReportDispatcher:
+    """
+    Envia os relatórios agendados de vários servidores em paralelo
+    Um semáforo limita os envios simultâneos, cada rota respeita seu limite
+    e um jitter opcional espalha o pico das 23:59
+    """
+    
+    def __init__(self, max_concurrency: int = 5, jitter_seconds: float = 0,
+                 max_retries: int = 3, route_limiter: Optional[RouteLimiter] = None,
+                 scheduler: Optional[OutboundScheduler] = None):
+        self.max_concurrency = max_concurrency
+        self.jitter_seconds = jitter_seconds
+        self.max_retries = max_retries
+        self.route_limiter = route_limiter or RouteLimiter()
+        self.scheduler = scheduler or OutboundScheduler()
+        
+        # Métricas por servidor do último envio
+        self.latencies: Dict[int, float] = {}
+        self.failures: Dict[int, int] = {}
+        self.last_errors: Dict[int, str] = {}
+    
+    async def dispatch(self, jobs: List[ReportJob]) -> Dict[int, bool]:
+        """Envia todos os relatórios; retorna guild_id -> sucesso"""
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        started = time.monotonic()
+        
+        results = await asyncio.gather(*(self._run(job, semaphore) for job in jobs))
+        self.route_limiter.forget_idle()
+        
+        sent = sum(results)
+        print(f"📨 {sent}/{len(jobs)} relatórios enviados em "
+              f"{time.monotonic() - started:.1f}s")
+        return {job.guild_id: ok for job, ok in zip(jobs, results)}
+    
+    async def _run(self, job: ReportJob, semaphore: asyncio.Semaphore) -> bool:
+        if self.jitter_seconds:
+            await asyncio.sleep(random.uniform(0, self.jitter_seconds))
+        
+        async with semaphore:
+            started = time.monotonic()
+            for attempt in range(self.max_retries + 1):
+                await self.route_limiter.acquire(job.route)
+                try:
+                    await self.scheduler.run(OutboundScheduler.REPORT, job.route, job.send)
+                    self.latencies[job.guild_id] = time.monotonic() - started
+                    self.last_errors.pop(job.guild_id, None)
+                    return True
+                except Exception as e:
+                    retry_after = get_retry_after(e)
+                    if retry_after is None or attempt == self.max_retries:
+                        self.failures[job.guild_id] = self.failures.get(job.guild_id, 0) + 1
+                        self.last_errors[job.guild_id] = str(e)
+                        return False
+                    
+                    # 429: bloqueia a rota e tenta de novo depois do prazo
+                    self.route_limiter.block(job.route, retry_after)
+        return False
\ No newline at end of file
@@ -0,0 +1,68 @@
+# services/route_limiter.py
+import asyncio
+import time
+from collections import deque
+from typing import Deque, Dict, Hashable, Optional
+
+
+def get_retry_after(error: Exception) -> Optional[float]:
+    """
+    Segundos pedidos pelo Discord em um erro 429 (None se não for rate limit)
+    Lido por atributos para o service não depender da biblioteca do Discord
+    """
+    retry_after = getattr(error, 'retry_after', None)
+    if retry_after is not None:
+        return float(retry_after)
+    
+    if getattr(error, 'status', None) != 429:
+        return None
+    
+    response = getattr(error, 'response', None)
+    headers = getattr(response, 'headers', None) or {}
+    try:
+        return float(headers.get('Retry-After', 1))
+    except (TypeError, ValueError):
+        return 1.0
+
+
+class RouteLimiter:
+    """
+    Limite de envios por rota (ex.: canal) em janela deslizante
+    Uma rota que recebeu 429 fica bloqueada até o retry_after informado
+    """
+    
+    def __init__(self, limit: int = 5, period: float = 5.0):
+        self.limit = limit
+        self.period = period
+        self._sent: Dict[Hashable, Deque[float]] = {}
+        self._blocked_until: Dict[Hashable, float] = {}
+    
+    async def acquire(self, route: Hashable):
+        """Aguarda até a rota ter espaço para mais um envio"""
+        while True:
+            now = time.monotonic()
+            wait = self._blocked_until.get(route, 0) - now
+            
+            sent = self._sent.setdefault(route, deque())
+            while sent and now - sent[0] >= self.period:
+                sent.popleft()
+            if len(sent) >= self.limit:
+                wait = max(wait, sent[0] + self.period - now)
+            
+            if wait <= 0:
+                sent.append(now)
+                self._blocked_until.pop(route, None)
+                return
+            await asyncio.sleep(wait)
+    
+    def block(self, route: Hashable, seconds: float):
+        """Bloqueia a rota após um 429"""
+        until = time.monotonic() + seconds
+        self._blocked_until[route] = max(self._blocked_until.get(route, 0), until)
+    
+    def forget_idle(self):
+        """Descarta rotas sem envios recentes"""
+        now = time.monotonic()
+        for route in [r for r, sent in self._sent.items()
+                      if not sent or now - sent[-1] >= self.period]:
+            self._sent.pop(route, None)
\ No newline at end of file
@@ -0,0 +1,470 @@
+# services/stats_aggregator.py
+import asyncio
+import json
+import os
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from itertools import accumulate
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from models.action import ActionData, ActionStatus
+from services.history_store import history_cutoff
+from services.persistence import atomic_write_json
+
+
+SCALAR_KEYS = ['total_actions', 'completed_actions', 'victories', 'defeats', 'inactivities']
+COUNTER_KEYS = ['participant_count', 'victory_count', 'escalator_count',
+                'call_p1_count', 'call_p2_count']
+
+
+def empty_statistics() -> Dict:
+    """Estatísticas zeradas no formato usado pelos relatórios"""
+    stats = {key: 0 for key in SCALAR_KEYS}
+    for key in COUNTER_KEYS:
+        stats[key] = defaultdict(int)
+    return stats
+
+
+def add_action_statistics(stats: Dict, action: ActionData):
+    """Soma a contribuição de uma ação às estatísticas"""
+    stats['total_actions'] += 1
+    
+    # Apenas ações com resultado entram nas contagens
+    if not action.has_result():
+        return
+    
+    stats['completed_actions'] += 1
+    
+    if action.status == ActionStatus.VITORIA.value:
+        stats['victories'] += 1
+    elif action.status == ActionStatus.DERROTA.value:
+        stats['defeats'] += 1
+    elif action.status == ActionStatus.INATIVIDADE.value:
+        stats['inactivities'] += 1
+    
+    # Contabiliza participações
+    for participant_id in action.participant_ids:
+        stats['participant_count'][participant_id] += 1
+        
+        # Contabiliza vitórias
+        if action.status == ActionStatus.VITORIA.value:
+            stats['victory_count'][participant_id] += 1
+    
+    # Contabiliza escalações
+    if action.escalator_id:
+        stats['escalator_count'][action.escalator_id] += 1
+    
+    # Contabiliza calls
+    if action.call_p1_id:
+        stats['call_p1_count'][action.call_p1_id] += 1
+    
+    if action.call_p2_id:
+        stats['call_p2_count'][action.call_p2_id] += 1
+
+
+def action_statistics(action: ActionData) -> Dict:
+    """Contribuição de uma única ação às estatísticas"""
+    stats = empty_statistics()
+    add_action_statistics(stats, action)
+    return stats
+
+
+def merge_statistics(stats: Dict, other: Dict):
+    """Soma outras estatísticas (ex.: a contribuição de uma ação) às estatísticas"""
+    for key in SCALAR_KEYS:
+        stats[key] += other[key]
+    for key in COUNTER_KEYS:
+        for user_id, count in other[key].items():
+            stats[key][user_id] += count
+
+
+class DayCalendar:
+    """
+    Calendário diário de um servidor guardado como somas acumuladas
+    totals[chave][i] soma os dias start..start+i, então o total de uma janela
+    [a, b] é totals[b] - totals[a-1] (O(1)) e os rankings custam O(usuários)
+    """
+    
+    def __init__(self, start: date, length: int = 0):
+        self.start = start
+        self.length = length
+        self.totals: Dict[str, List[int]] = {key: [0] * length for key in SCALAR_KEYS}
+        self.users: Dict[str, Dict[int, List[int]]] = {key: {} for key in COUNTER_KEYS}
+    
+    @property
+    def end(self) -> date:
+        return self.start + timedelta(days=self.length - 1)
+    
+    @classmethod
+    def from_buckets(cls, buckets: Dict[str, Dict]) -> 'DayCalendar':
+        """Monta o calendário a partir das estatísticas de cada dia"""
+        days = sorted(buckets)
+        start = date.fromisoformat(days[0])
+        calendar = cls(start, (date.fromisoformat(days[-1]) - start).days + 1)
+        
+        daily_totals = {key: [0] * calendar.length for key in SCALAR_KEYS}
+        daily_users = {key: {} for key in COUNTER_KEYS}
+        for day, stats in buckets.items():
+            i = (date.fromisoformat(day) - start).days
+            for key in SCALAR_KEYS:
+                daily_totals[key][i] = stats[key]
+            for key in COUNTER_KEYS:
+                for user_id, count in stats[key].items():
+                    daily_users[key].setdefault(user_id, [0] * calendar.length)[i] = count
+        
+        calendar.totals = {key: list(accumulate(values)) for key, values in daily_totals.items()}
+        calendar.users = {key: {user_id: list(accumulate(values)) for user_id, values in users.items()}
+                          for key, users in daily_users.items()}
+        return calendar
+    
+    def _cover(self, day: date):
+        """Estende as listas para incluir o dia (antes do início ou depois do fim)"""
+        if self.length == 0:
+            self.start = day
+        
+        before = (self.start - day).days
+        if before > 0:
+            self.start = day
+            self.length += before
+            for values in self.totals.values():
+                values[:0] = [0] * before
+            for users in self.users.values():
+                for values in users.values():
+                    values[:0] = [0] * before
+        
+        after = (day - self.start).days + 1 - self.length
+        if after > 0:
+            self.length += after
+            for values in self.totals.values():
+                values.extend([values[-1] if values else 0] * after)
+            for users in self.users.values():
+                for values in users.values():
+                    values.extend([values[-1]] * after)
+    
+    def add(self, day: date, stats: Dict, sign: int = 1):
+        """Soma (sign=1) ou subtrai (sign=-1) as estatísticas de um dia"""
+        self._cover(day)
+        i = (day - self.start).days
+        
+        for key in SCALAR_KEYS:
+            delta = stats[key] * sign
+            if delta:
+                values = self.totals[key]
+                for j in range(i, self.length):
+                    values[j] += delta
+        
+        for key in COUNTER_KEYS:
+            for user_id, count in stats[key].items():
+                values = self.users[key].setdefault(user_id, [0] * self.length)
+                for j in range(i, self.length):
+                    values[j] += count * sign
+    
+    def window(self, first: date, last: date) -> Dict:
+        """Estatísticas dos dias first..last (inclusive)"""
+        stats = empty_statistics()
+        if self.length == 0:
+            return stats
+        
+        a = max((first - self.start).days, 0)
+        b = min((last - self.start).days, self.length - 1)
+        if a > b:
+            return stats
+        
+        for key in SCALAR_KEYS:
+            values = self.totals[key]
+            stats[key] = values[b] - (values[a - 1] if a > 0 else 0)
+        
+        for key in COUNTER_KEYS:
+            for user_id, values in self.users[key].items():
+                count = values[b] - (values[a - 1] if a > 0 else 0)
+                if count:
+                    stats[key][user_id] = count
+        return stats
+    
+    def to_dict(self) -> Dict:
+        return {
+            'start': self.start.isoformat(),
+            'length': self.length,
+            'totals': self.totals,
+            'users': {key: {str(user_id): values for user_id, values in users.items()}
+                      for key, users in self.users.items()}
+        }
+    
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'DayCalendar':
+        calendar = cls(date.fromisoformat(data['start']), data['length'])
+        calendar.totals = data['totals']
+        calendar.users = {key: {int(user_id): values for user_id, values in users.items()}
+                          for key, users in data['users'].items()}
+        return calendar
+
+
+class StatsAggregator:
+    """
+    Estatísticas dos relatórios pré-agregadas por servidor e por dia
+    Cada servidor tem um DayCalendar de somas acumuladas, gravado ao lado do
+    histórico (stats_rollups.json) e reconstruído dele quando falta ou está velho
+    
+    Os últimos recent_days dias (e as ações ativas) ficam também por ação em
+    memória: cada evento do ActionService tira do calendário a contribuição
+    anterior da ação e soma a nova, e o dia parcial das janelas vem daí.
+    Só ações mais antigas fora da memória marcam o dia como sujo, relido do
+    histórico na próxima consulta
+    """
+    
+    def __init__(self, action_service, data_dir: str = "data", recent_days: int = 8):
+        self.action_service = action_service
+        self.rollups_file = os.path.join(data_dir, "stats_rollups.json")
+        self.recent_days = recent_days
+        
+        # Carregado na primeira consulta
+        self._calendars: Optional[Dict[int, DayCalendar]] = None
+        self._load_lock = asyncio.Lock()
+        # guild_id -> action_id -> (created_at, contribuição aplicada ao calendário)
+        self._recent: Dict[int, Dict[str, Tuple[str, Dict]]] = defaultdict(dict)
+        # Dia (YYYY-MM-DD) a partir do qual todas as ações estão em _recent
+        self._recent_from = ""
+        # guild_id -> dias (YYYY-MM-DD) com ações antigas alteradas desde a última consulta
+        self._dirty_days: Dict[int, Set[str]] = defaultdict(set)
+        
+        action_service.add_listener(self._on_action_event)
+    
+    def _on_action_event(self, event: str, action: ActionData):
+        # Antes da carga não há o que corrigir: ela já parte do estado em memória.
+        # Ações apagadas continuam no histórico e nos relatórios
+        if self._calendars is None or event == "deleted":
+            return
+        self._apply(action)
+    
+    def _apply(self, action: ActionData):
+        """Troca no calendário a contribuição anterior da ação pela atual"""
+        day = action.created_at[:10]
+        contributions = self._recent[action.guild_id]
+        previous = contributions.get(action.action_id)
+        if previous is None and day < self._recent_from:
+            # Ação antiga sem contribuição conhecida: o dia é relido do histórico
+            self._dirty_days[action.guild_id].add(day)
+            return
+        
+        stats = action_statistics(action)
+        if previous is not None and previous[1] == stats:
+            return
+        
+        day_date = date.fromisoformat(day)
+        calendar = self._calendars.get(action.guild_id)
+        if calendar is None:
+            calendar = self._calendars[action.guild_id] = DayCalendar(day_date)
+        if previous is not None:
+            calendar.add(day_date, previous[1], sign=-1)
+        calendar.add(day_date, stats)
+        contributions[action.action_id] = (action.created_at, stats)
+    
+    async def _ensure_calendars(self) -> Dict[int, DayCalendar]:
+        """
+        Carrega os calendários do arquivo (ou reconstrói se faltar ou estiver
+        velho) fora do event loop e sobrepõe a eles o estado em memória das ações
+        """
+        async with self._load_lock:
+            if self._calendars is not None:
+                return self._calendars
+            
+            # Dias recentes e ações ativas mais antigas ficam por ação em memória
+            first = (date.today() - timedelta(days=self.recent_days)).isoformat()
+            first = min([first] + [action.created_at[:10] for action in self._in_memory()])
+            end = (date.today() + timedelta(days=1)).isoformat()
+            
+            calendars, recent = await asyncio.to_thread(self._read_calendars, first, end)
+            
+            self._calendars = calendars
+            self._recent = defaultdict(dict)
+            self._recent_from = first
+            for action in recent:
+                self._recent[action.guild_id][action.action_id] = \
+                    (action.created_at, action_statistics(action))
+            
+            # Mutações que ainda não chegaram ao disco (inclusive as feitas
+            # durante a leitura) entram por cima, como eventos
+            for action in self._in_memory():
+                self._apply(action)
+            return self._calendars
+    
+    def _in_memory(self) -> List[ActionData]:
+        """Ações cujo estado em memória pode estar à frente do histórico"""
+        return list(self.action_service.active_actions.values()) + \
+            self.action_service.pending_history()
+    
+    def _read_calendars(self, first: str, end: str):
+        """
+        Lê os calendários (do arquivo ou do histórico) e as ações criadas em
+        [first, end); roda em uma thread, sem tocar no estado do agregador
+        """
+        calendars = None
+        signature = self.action_service.history_store.signature()
+        if os.path.exists(self.rollups_file):
+            try:
+                with open(self.rollups_file, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                if data.get('signature') == signature:
+                    calendars = {int(guild_id): DayCalendar.from_dict(calendar)
+                                 for guild_id, calendar in data['guilds'].items()}
+            except Exception as e:
+                print(f"❌ Erro ao carregar rollups de estatísticas: {e}")
+        
+        if calendars is None:
+            calendars = self.rebuild()
+        return calendars, self.action_service.load_history_between(first, end)
+    
+    def _prune_recent(self):
+        """Esquece as ações que saíram da janela recente (as ativas ficam)"""
+        first = (date.today() - timedelta(days=self.recent_days)).isoformat()
+        if first <= self._recent_from:
+            return
+        
+        active = self.action_service.active_actions
+        for contributions in self._recent.values():
+            for action_id in [action_id for action_id, (created_at, _) in contributions.items()
+                              if created_at[:10] < first and action_id not in active]:
+                del contributions[action_id]
+        self._recent_from = first
+    
+    def rebuild(self) -> Dict[int, DayCalendar]:
+        """
+        Reconstrói e grava os calendários com uma passada pelo histórico
+        Reflete só o disco; as mutações ainda fora dele são aplicadas depois
+        """
+        buckets: Dict[int, Dict[str, Dict]] = defaultdict(dict)
+        for action in self.action_service.load_history():
+            day_stats = buckets[action.guild_id].setdefault(action.created_at[:10], empty_statistics())
+            add_action_statistics(day_stats, action)
+        
+        calendars = {guild_id: DayCalendar.from_buckets(days)
+                     for guild_id, days in buckets.items()}
+        self._save(calendars)
+        print(f"📊 Rollups de estatísticas reconstruídos ({len(calendars)} servidores)")
+        return calendars
+    
+    def save(self):
+        """Grava os calendários junto com a assinatura do histórico que os gerou"""
+        if self._calendars is not None:
+            self._save(self._calendars)
+    
+    def _save(self, calendars: Dict[int, DayCalendar]):
+        try:
+            data = {
+                'signature': self.action_service.history_store.signature(),
+                'guilds': {str(guild_id): calendar.to_dict()
+                           for guild_id, calendar in calendars.items()}
+            }
+            atomic_write_json(self.rollups_file, data, separators=(',', ':'))
+        except Exception as e:
+            print(f"❌ Erro ao salvar rollups de estatísticas: {e}")
+    
+    def _take_dirty(self, guild_ids: Iterable[int]) -> Dict[int, Set[str]]:
+        """Retira os dias sujos dos servidores"""
+        return {guild_id: self._dirty_days.pop(guild_id) for guild_id in guild_ids
+                if self._dirty_days.get(guild_id)}
+    
+    def _read_dirty(self, dirty: Dict[int, Set[str]]) -> List[ActionData]:
+        """Uma única leitura do histórico cobre os dias sujos de todos os servidores"""
+        all_days = set().union(*dirty.values())
+        end = (date.fromisoformat(max(all_days)) + timedelta(days=1)).isoformat()
+        only_guild = next(iter(dirty)) if len(dirty) == 1 else None
+        return self.action_service.load_history_between(min(all_days), end, only_guild)
+    
+    def _refresh(self, dirty: Dict[int, Set[str]], actions: List[ActionData]):
+        """
+        Substitui no calendário os dias sujos pelo que foi relido do histórico
+        Ações com contribuição em memória entram com ela, que pode estar à
+        frente do disco (mutações feitas durante a leitura)
+        """
+        buckets = {guild_id: {day: empty_statistics() for day in days}
+                   for guild_id, days in dirty.items()}
+        for action in actions:
+            day_stats = buckets.get(action.guild_id, {}).get(action.created_at[:10])
+            if day_stats is not None and action.action_id not in self._recent[action.guild_id]:
+                add_action_statistics(day_stats, action)
+        
+        for guild_id, days in buckets.items():
+            for created_at, contribution in self._recent[guild_id].values():
+                day_stats = days.get(created_at[:10])
+                if day_stats is not None:
+                    merge_statistics(day_stats, contribution)
+        
+        for guild_id, days in buckets.items():
+            calendar = self._calendars.get(guild_id)
+            if calendar is None:
+                calendar = self._calendars[guild_id] = DayCalendar(date.fromisoformat(min(days)))
+            for day, stats in days.items():
+                day_date = date.fromisoformat(day)
+                calendar.add(day_date, calendar.window(day_date, day_date), sign=-1)
+                calendar.add(day_date, stats)
+    
+    async def _prepare(self, guild_ids: List[int]):
+        """Deixa os calendários dos servidores com os dias sujos já corrigidos"""
+        await self._ensure_calendars()
+        self._prune_recent()
+        if any(self._dirty_days.get(guild_id) for guild_id in guild_ids):
+            # Dias sujos são relidos do histórico: grava o lote pendente antes
+            await self.action_service.flush()
+            dirty = self._take_dirty(guild_ids)
+            if dirty:
+                self._refresh(dirty, await asyncio.to_thread(self._read_dirty, dirty))
+    
+    async def get_statistics(self, guild_id: int, days: Optional[int] = None) -> Dict:
+        """
+        Estatísticas das ações criadas nos últimos N dias
+        Dias inteiros vêm do calendário; o primeiro dia (parcial) vem das
+        contribuições em memória, ou do histórico se for anterior a elas
+        """
+        return (await self.get_statistics_many([guild_id], days))[guild_id]
+    
+    async def get_statistics_many(self, guild_ids: List[int],
+                                  days: Optional[int] = None) -> Dict[int, Dict]:
+        """
+        Estatísticas de vários servidores de uma vez (relatórios agendados)
+        Se o dia parcial precisar do histórico, ele é lido uma única vez e
+        dividido por servidor
+        """
+        await self._prepare(guild_ids)
+        
+        cutoff = history_cutoff(days)
+        results = {}
+        if not cutoff:
+            for guild_id in guild_ids:
+                calendar = self._calendars.get(guild_id)
+                results[guild_id] = calendar.window(calendar.start, calendar.end) \
+                    if calendar else empty_statistics()
+            return results
+        
+        first_day = datetime.fromisoformat(cutoff).date()
+        next_day = first_day + timedelta(days=1)
+        for guild_id in guild_ids:
+            calendar = self._calendars.get(guild_id)
+            results[guild_id] = calendar.window(next_day, max(calendar.end, date.today())) \
+                if calendar else empty_statistics()
+        
+        if first_day.isoformat() >= self._recent_from:
+            for guild_id in guild_ids:
+                stats = results[guild_id]
+                for created_at, contribution in self._recent.get(guild_id, {}).values():
+                    if cutoff <= created_at < next_day.isoformat():
+                        merge_statistics(stats, contribution)
+            return results
+        
+        # Primeiro dia (parcial) de todos os servidores em uma leitura
+        only_guild = guild_ids[0] if len(guild_ids) == 1 else None
+        actions = await asyncio.to_thread(self.action_service.load_history_between,
+                                          cutoff, next_day.isoformat(), only_guild)
+        for action in actions:
+            stats = results.get(action.guild_id)
+            if stats is not None:
+                add_action_statistics(stats, action)
+        return results
+    
+    def close(self):
+        """Aplica os dias sujos e grava os calendários (após o flush do histórico)"""
+        if self._calendars is None:
+            return
+        dirty = self._take_dirty(list(self._dirty_days))
+        if dirty:
+            self._refresh(dirty, self._read_dirty(dirty))
+        self.save()
\ No newline at end of file
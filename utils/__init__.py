@@ -9,6 +9,7 @@ __all__ = [
     'is_admin',
     'can_manage_action',
     'get_missing_roles_text',
+    'check_rate_limit',
     'create_action_embed',
     'create_config_embed',
     'create_error_embed',
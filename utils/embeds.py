@@ -1,8 +1,14 @@
 # utils/embeds.py
 import discord
+from collections import OrderedDict
 from datetime import datetime
 from models.action import ActionData, ActionStatus
-from typing import Optional
+from typing import Optional, Tuple
+
+
+# Embeds das ações já renderizados, por (action_id, versão)
+ACTION_EMBED_CACHE_SIZE = 512
+_action_embed_cache: "OrderedDict[Tuple[str, int], discord.Embed]" = OrderedDict()
 
 
 def get_status_color(status: str) -> discord.Color:
@@ -57,16 +63,35 @@ def get_status_text(status: str) -> str:
 
 
 def create_action_embed(action: ActionData, guild: discord.Guild) -> discord.Embed:
+    """
+    Embed da ação com todas as informações
+    Reaproveitado enquanto a versão da ação não mudar; quem recebe não deve alterá-lo
+    """
+    key = (action.action_id, action.version)
+    embed = _action_embed_cache.get(key)
+    if embed is not None:
+        _action_embed_cache.move_to_end(key)
+        return embed
+    
+    embed = _build_action_embed(action)
+    _action_embed_cache[key] = embed
+    while len(_action_embed_cache) > ACTION_EMBED_CACHE_SIZE:
+        _action_embed_cache.popitem(last=False)
+    return embed
+
+
+def _build_action_embed(action: ActionData) -> discord.Embed:
     """Cria embed da ação com todas as informações"""
     emoji = get_status_emoji(action.status)
     color = get_status_color(action.status)
     status_text = get_status_text(action.status)
+    created_dt = datetime.fromisoformat(action.created_at)
     
     embed = discord.Embed(
         title=f"🚨 {action.display_name}",
         description=f"**{action.action_name}**",
         color=color,
-        timestamp=datetime.fromisoformat(action.created_at)
+        timestamp=created_dt
     )
     
     # Status
@@ -77,7 +102,6 @@ def create_action_embed(action: ActionData, guild: discord.Guild) -> discord.Emb
     )
     
     # Horário de criação
-    created_dt = datetime.fromisoformat(action.created_at)
     embed.add_field(
         name="Criada em",
         value=f"<t:{int(created_dt.timestamp())}:R>",
@@ -67,4 +67,17 @@ def get_missing_roles_text(member: discord.Member, guild_id: int, config_service
     if not role_names:
         return "Cargos configurados não foram encontrados"
     
-    return f"Você precisa ter um dos seguintes cargos: **{', '.join(role_names)}**"
\ No newline at end of file
+    return f"Você precisa ter um dos seguintes cargos: **{', '.join(role_names)}**"
+
+async def check_rate_limit(interaction: discord.Interaction, kind: str) -> bool:
+    """Consulta o limitador compartilhado; avisa o usuário quando ele deve aguardar"""
+    guild_id = interaction.guild.id if interaction.guild else 0
+    if interaction.client.rate_limiter.allow(interaction.user.id, guild_id, kind):
+        return True
+    
+    message = "⏱️ Aguarde alguns segundos antes de clicar novamente!"
+    if interaction.response.is_done():
+        await interaction.followup.send(message, ephemeral=True)
+    else:
+        await interaction.response.send_message(message, ephemeral=True)
+    return False
\ No newline at end of file